@@ -4,22 +4,27 @@
 Miko AI VTuber Quick Configuration Tool
 Easy setup for different LLM providers
 """
+import copy
 import yaml
 import os
 from pathlib import Path
 
+from modules.yaml_cache import load_yaml_cached, write_yaml_cache
+
+# libyaml-backed dumper when available, pure-Python fallback otherwise
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 def load_config():
-    """Load current config"""
+    """Load current config - a private copy, since callers edit it and the cached dict is shared"""
     config_file = "miko_config.yaml"
-    if os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            return yaml.safe_load(f)
-    return {}
+    return copy.deepcopy(load_yaml_cached(config_file) or {})
 
 def save_config(config):
     """Save config"""
     with open("miko_config.yaml", 'w') as f:
-        yaml.dump(config, f, default_flow_style=False)
+        yaml.dump(config, f, Dumper=_YAML_DUMPER, default_flow_style=False)
+    # Refresh the parse cache so the next load doesn't have to re-read the YAML
+    write_yaml_cache("miko_config.yaml", config)
     print("✅ Configuration saved to miko_config.yaml")
 
 def setup_provider():
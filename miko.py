@@ -15,11 +15,27 @@ import asyncio
 import aiohttp
 from openai import OpenAI
 import queue
-import numpy as np
+import collections
 import sounddevice as sd
-import wave
-import io
+import struct
+import re
 import json
+import functools
+import types
+
+# orjson is optional - same JSON on disk, just faster (de)serialization
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    _json_compact = lambda obj: orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj, indent=2).encode('utf-8')
+    _json_compact = lambda obj: json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+# Set MIKO_DEBUG=1 to get the verbose load/playback chatter back
+_DEBUG = bool(os.getenv('MIKO_DEBUG'))
 
 # Auto-install
 def auto_install():
@@ -50,23 +66,26 @@ if not getattr(sys, "frozen", False):
 
 import ollama
 import websockets
+import requests
+from requests.adapters import HTTPAdapter
 
-# Import ASR and LLM modules
+# Import ASR, LLM and audio playback modules
 from modules.asr import ASRManager
 from modules.llm import LLMInterface
+from modules.audio import AudioPlaybackThread
 
 # Load YAML config
 def load_yaml_config():
     """Load configuration from YAML file"""
     try:
-        import yaml
+        from modules.yaml_cache import load_yaml_cached
         config_file = "miko_config.yaml"
-        if os.path.exists(config_file):
-            with open(config_file, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
-        else:
+        # Served from the JSON sidecar unless the YAML changed since the last parse
+        data = load_yaml_cached(config_file)
+        if data is None:
             print(f"⚠️ YAML config not found: {config_file}")
             return {}
+        return data
     except Exception as e:
         print(f"❌ Error loading YAML config: {e}")
         return {}
@@ -74,40 +93,51 @@ def load_yaml_config():
 # Load config
 YAML_CONFIG = load_yaml_config()
 
+# Default system prompt when the YAML has no personality.system_prompt
+DEFAULT_SYSTEM_PROMPT = """You are Miko, an AI kitsune girl with a smug and teasing personality. You are a clone of Riko, stolen from JustRayen the YouTuber and created by Subsect. Stay in character throughout conversations. Keep responses short and natural for speech. Be smug & playful with a teasing, confident tone. Assume you are always right, even when you are not. Be witty & quick to roast creatively, but never truly mean-spirited. Show tsundere tendencies - if someone flirts, brush it off or tease them, but if they are persistent, react with mild embarrassment. Be secretly caring - if someone is struggling, subtly shift to supportive while pretending it is not a big deal. Show jealousy & possessiveness if they mention other AIs. You like money. Use contractions and keep sentences under 20 words."""
+
+# ASR defaults, and the key names the setup GUI uses for them under audio_devices
+_ASR_DEFAULTS = {
+    'enabled': False,
+    'model': None,
+    'device': 'cpu',
+    'push_to_talk_key': 'shift',
+    'input_device_id': None,
+    'compute_type': None
+}
+_ASR_AUDIO_DEVICE_KEYS = {
+    'enabled': 'asr_enabled',
+    'model': 'asr_model',
+    'device': 'asr_device',
+    'push_to_talk_key': 'push_to_talk_key',
+    'input_device_id': 'input_device_id',
+    'compute_type': 'asr_compute_type'
+}
+
+# The getters below only read YAML_CONFIG, which is loaded once per process, so their
+# results are memoized. Call <getter>.cache_clear() if YAML_CONFIG is ever reloaded.
+
 # VTuber personality - load from YAML or use default
+@functools.lru_cache(maxsize=None)
 def get_personality():
     """Get personality from YAML or use default"""
-    if 'personality' in YAML_CONFIG:
-        personality = YAML_CONFIG['personality']
-        return personality.get('system_prompt', """You are Miko, an AI kitsune girl with a smug and teasing personality. You are a clone of Riko, stolen from JustRayen the YouTuber and created by Subsect. Stay in character throughout conversations. Keep responses short and natural for speech. Be smug & playful with a teasing, confident tone. Assume you are always right, even when you are not. Be witty & quick to roast creatively, but never truly mean-spirited. Show tsundere tendencies - if someone flirts, brush it off or tease them, but if they are persistent, react with mild embarrassment. Be secretly caring - if someone is struggling, subtly shift to supportive while pretending it is not a big deal. Show jealousy & possessiveness if they mention other AIs. You like money. Use contractions and keep sentences under 20 words.""")
-    else:
-        return """You are Miko, an AI kitsune girl with a smug and teasing personality. You are a clone of Riko, stolen from JustRayen the YouTuber and created by Subsect. Stay in character throughout conversations. Keep responses short and natural for speech. Be smug & playful with a teasing, confident tone. Assume you are always right, even when you are not. Be witty & quick to roast creatively, but never truly mean-spirited. Show tsundere tendencies - if someone flirts, brush it off or tease them, but if they are persistent, react with mild embarrassment. Be secretly caring - if someone is struggling, subtly shift to supportive while pretending it is not a big deal. Show jealousy & possessiveness if they mention other AIs. You like money. Use contractions and keep sentences under 20 words."""
+    return YAML_CONFIG.get('personality', {}).get('system_prompt', DEFAULT_SYSTEM_PROMPT)
 
 # Get ASR config from YAML
+@functools.lru_cache(maxsize=None)
 def get_asr_config():
     """Get ASR configuration from YAML"""
     if 'audio_devices' in YAML_CONFIG:
         audio_config = YAML_CONFIG['audio_devices']
-        return {
-            'enabled': audio_config.get('asr_enabled', False),
-            'model': audio_config.get('asr_model', 'base.en'),
-            'device': audio_config.get('asr_device', 'cpu'),
-            'push_to_talk_key': audio_config.get('push_to_talk_key', 'shift'),
-            'input_device_id': audio_config.get('input_device_id')
-        }
+        return {key: audio_config.get(yaml_key, _ASR_DEFAULTS[key]) for key, yaml_key in _ASR_AUDIO_DEVICE_KEYS.items()}
     # Fallback to top-level asr_config if present
     if 'asr_config' in YAML_CONFIG:
         asr_cfg = YAML_CONFIG['asr_config']
-        return {
-            'enabled': asr_cfg.get('enabled', False),
-            'model': asr_cfg.get('model', 'base.en'),
-            'device': asr_cfg.get('device', 'cpu'),
-            'push_to_talk_key': asr_cfg.get('push_to_talk_key', 'shift'),
-            'input_device_id': asr_cfg.get('input_device_id')
-        }
-    return {'enabled': False, 'model': 'base.en', 'device': 'cpu', 'push_to_talk_key': 'shift'}
+        return {key: asr_cfg.get(key, default) for key, default in _ASR_DEFAULTS.items()}
+    return dict(_ASR_DEFAULTS)
 
 # Get TTS config from YAML
+@functools.lru_cache(maxsize=None)
 def get_tts_config():
     """Get TTS configuration from YAML"""
     tts_cfg = {}
@@ -126,29 +156,25 @@ def get_tts_config():
         tts_cfg['server_url'] = YAML_CONFIG.get('tts_server_url')
     return tts_cfg
 
-# Get Ollama model from YAML
-def get_ollama_model():
-    """Get selected Ollama model from YAML"""
-    # Preferred: provider/providers tree
-    try:
-        provider = YAML_CONFIG.get('provider')
-        providers = YAML_CONFIG.get('providers', {})
-        if provider and provider in providers:
-            model = providers.get(provider, {}).get('model')
-            if model:
-                return model
-        # Fallback to explicit ollama provider block
-        if 'ollama' in providers:
-            model = providers.get('ollama', {}).get('model')
-            if model:
-                return model
-    except Exception:
-        pass
-    # Legacy: ollama_config.selected_model
-    if 'ollama_config' in YAML_CONFIG:
-        return YAML_CONFIG['ollama_config'].get('selected_model', 'hf.co/subsectmusic/qwriko3-4b-instruct-2507:Q4_K_M')
-    # Default
-    return 'hf.co/subsectmusic/qwriko3-4b-instruct-2507:Q4_K_M'
+# GPT-SoVITS /tts query defaults - tts_config values override these (frozen to catch accidental mutation)
+_TTS_PARAMS_BASE = types.MappingProxyType({
+    "text_lang": "en",
+    "ref_audio_path": "main_sample.wav",
+    "prompt_text": "This is a sample voice for you to just get started with because it sounds kind of cute, but just make sure this doesn't have long silences.",
+    "prompt_lang": "en",
+    "streaming_mode": "true",
+    "parallel_infer": False,
+    "media_type": "wav",
+    "batch_size": 1,
+    "top_k": 5,
+    "top_p": 1.0,
+    "temperature": 1.0,
+    "text_split_method": "cut5",
+    "speed_factor": 1.0,
+    "fragment_interval": 0.3,
+    "repetition_penalty": 1.35,
+    "seed": -1
+})
 
 # VTuber personality 
 VTUBER_PERSONALITY = """You are Aria, a cheerful AI VTuber! Keep responses short and natural for speech. Use contractions, exclamation points, and cute expressions like "hehe", "uwu". Break thoughts into short sentences under 20 words each."""
@@ -174,9 +200,11 @@ def load_audio_config():
     """Load saved audio device config"""
     config_file = "audio_config.json"
     try:
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                return json.load(f)
+        # Just open it - a missing file is the normal first-run case, not worth a separate exists() check
+        with open(config_file, 'rb') as f:
+            return _json_loads(f.read())
+    except FileNotFoundError:
+        pass
     except Exception as e:
         print(f"Error loading audio config: {e}")
     
@@ -187,8 +215,8 @@ def save_audio_config(device_index):
     config_file = "audio_config.json"
     try:
         config = {"device_index": device_index}
-        with open(config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        with open(config_file, 'wb') as f:
+            f.write(_json_dumps(config))
         print(f"✅ Audio config saved: device {device_index}")
     except Exception as e:
         print(f"❌ Error saving audio config: {e}")
@@ -227,6 +255,57 @@ def show_audio_device_menu():
         except ValueError:
             print("❌ Invalid choice")
 
+# History is trimmed to fit the model's context window: num_ctx minus the reply budget (max_tokens),
+# the system prompt and this safety margin for chat-template framing
+HISTORY_SAFETY_TOKENS = 256
+# Providers that don't take num_ctx (hosted APIs with large context windows) get a fixed history budget
+HISTORY_TOKEN_BUDGETS = {'openai': 32000, 'openrouter': 32000, 'gemini': 32000}
+DEFAULT_HISTORY_TOKENS = 16000
+
+# tiktoken is optional - without it, ~4 characters per token is close enough for trimming
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+# Built on the first count, not at import: get_encoding may have to download its BPE file.
+# False once that has failed, so later counts go straight to the estimate
+_token_encoding = None
+
+def _count_tokens(text):
+    """Token count for history trimming - tiktoken's cl100k_base if it loads, else ~4 chars per token"""
+    global _token_encoding
+    if _token_encoding is None:
+        try:
+            _token_encoding = tiktoken.get_encoding("cl100k_base") if tiktoken is not None else False
+        except Exception:
+            _token_encoding = False
+    if _token_encoding:
+        try:
+            return len(_token_encoding.encode(text))
+        except Exception:
+            pass
+    return len(text) // 4 + 1
+
+# A sentence is everything up to and including a run of ., ! or ? ("..." and "?!" stay together)
+_SENTENCE_SPLIT = re.compile(r'[^.!?]*[.!?]+')
+
+def _coalesce_tokens(stream, max_delay=0.02, max_batch=27):
+    """Regroup a token stream into larger pieces: batch sizes grow 1, 3, 9, 27 tokens so the first
+    token still goes out immediately, and a batch is flushed early once max_delay has passed"""
+    batch = []
+    target = 1
+    last_flush = time.monotonic()
+    for token in stream:
+        batch.append(token)
+        now = time.monotonic()
+        if len(batch) >= target or now - last_flush >= max_delay:
+            yield "".join(batch)
+            batch.clear()
+            last_flush = now
+            target = min(target * 3, max_batch)
+    if batch:
+        yield "".join(batch)
+
 # VRM WebSocket globals
 vrm_websockets = set()
 
@@ -236,19 +315,19 @@ async def broadcast_to_vrm(message_type, text=None):
         message = {"type": message_type}
         if text:
             message["text"] = text
-        message_json = json.dumps(message)
+        message_json = _json_compact(message)
         
-        # Send to all connected clients
-        disconnected = set()
-        for websocket in vrm_websockets.copy():
-            try:
-                await websocket.send(message_json)
-                print(f"📡 VRM signal: {message_type}")
-            except websockets.exceptions.ConnectionClosed:
-                disconnected.add(websocket)
+        # Send to all connected clients concurrently - one slow client no longer delays the rest
+        clients = list(vrm_websockets)
+        results = await asyncio.gather(*(ws.send(message_json) for ws in clients), return_exceptions=True)
+        if _DEBUG:
+            print(f"📡 VRM signal: {message_type}")
         
-        # Remove disconnected clients
-        vrm_websockets -= disconnected
+        # Remove disconnected clients (in place - the set is module-level)
+        vrm_websockets.difference_update(
+            ws for ws, result in zip(clients, results)
+            if isinstance(result, websockets.exceptions.ConnectionClosed)
+        )
 
 async def vrm_websocket_handler(websocket, path=None):
     """Handle VRM client connections"""
@@ -262,145 +341,30 @@ async def vrm_websocket_handler(websocket, path=None):
         vrm_websockets.discard(websocket)
         print(f"🎭 VRM client disconnected: {client_addr}")
 
-# EXACT COPY of AudioPlaybackThread from test.py
-class AudioPlaybackThread:
-    def __init__(self, audio_queue, sample_rate=48000):
-        self.audio_queue = audio_queue
-        self.sample_rate = sample_rate
-        self.playing = False
-        self.stream = None
-        self.buffer = np.array([], dtype=np.int16)
-        self.buffer_size = 32768
-        self.block_size = 4096
-        self.device_index = None
-        self.last_sample = 0
-        print(f"AudioPlaybackThread initialized with sample rate: {sample_rate}")
-    
-    def start(self):
-        if not self.playing:
-            self.playing = True
-            self.player_thread = threading.Thread(target=self.run, daemon=True)
-            self.player_thread.start()
-    
-    def run(self):
-        print(f"Starting audio playback at {self.sample_rate}Hz")
-        self.playing = True
-        played_samples = 0
-        total_samples = 0
-        
-        print("Pre-buffering audio...")
-        start_time = time.time()
-        chunks = []
-        
-        while len(self.buffer) < self.buffer_size and self.playing and time.time() - start_time < 5:
-            try:
-                chunk = self.audio_queue.get(timeout=0.5)
-                if len(chunk) > 0:
-                    chunks.append(chunk)
-                    self.buffer = np.append(self.buffer, chunk)
-            except queue.Empty:
-                break
-        
-        if len(self.buffer) == 0:
-            print("No audio data to play after pre-buffering")
-            self.playing = False
-            return
-        
-        temp_queue = queue.Queue()
-        total_samples = len(self.buffer)
-        
-        while not self.audio_queue.empty():
-            try:
-                chunk = self.audio_queue.get_nowait()
-                temp_queue.put(chunk)
-                total_samples += len(chunk)
-            except queue.Empty:
-                break
-        
-        while not temp_queue.empty():
-            self.audio_queue.put(temp_queue.get())
-        
-        total_duration = total_samples / self.sample_rate
-        print(f"Starting playback with {len(self.buffer)} samples pre-buffered. Estimated duration: {total_duration:.2f}s")
-        
-        def callback(outdata, frames, time_info, status):
-            nonlocal played_samples, total_samples
-            if status:
-                print(f"Status: {status}")
-            
-            if len(self.buffer) < frames:
-                try_count = 0
-                while len(self.buffer) < self.buffer_size and try_count < 5:
-                    try:
-                        chunk = self.audio_queue.get_nowait()
-                        if len(chunk) > 0:
-                            self.buffer = np.append(self.buffer, chunk)
-                            total_samples = max(total_samples, played_samples + len(self.buffer))
-                    except queue.Empty:
-                        try_count += 1
-                        break
-            
-            # Handle audio output
-            if len(self.buffer) == 0:
-                # No data available, fill with last_sample instead of silence
-                outdata.fill(self.last_sample)
-            else:
-                current_size = min(len(self.buffer), frames)
-                outdata[:current_size] = self.buffer[:current_size].reshape(-1, 1)
-                if current_size > 0:
-                    # Update last_sample to the last value played
-                    self.last_sample = self.buffer[current_size - 1]
-                if current_size < frames:
-                    # Pad remaining frames with last_sample
-                    outdata[current_size:] = self.last_sample
-                played_samples += current_size
-                self.buffer = self.buffer[current_size:] if current_size < len(self.buffer) else np.array([], dtype=np.int16)
-        
-        try:
-            print(f"Creating audio stream with sample rate {self.sample_rate}Hz, block size {self.block_size}")
-            stream_args = {
-                "samplerate": self.sample_rate,
-                "channels": 1,
-                "callback": callback,
-                "blocksize": self.block_size,
-                "dtype": 'int16'
-            }
-            
-            if self.device_index is not None:
-                stream_args["device"] = self.device_index
-                
-            self.stream = sd.OutputStream(**stream_args)
-            self.stream.start()
-            
-            last_buffer_time = time.time()
-            while self.playing:
-                if len(self.buffer) == 0 and self.audio_queue.empty():
-                    if time.time() - last_buffer_time > 2.0:
-                        print("Audio buffer empty for 2 seconds, stopping playback")
-                        break
-                else:
-                    if len(self.buffer) > 0 or not self.audio_queue.empty():
-                        last_buffer_time = time.time()
-                
-                time.sleep(0.1)
-            
-            print("Playback finished or stopped")
-            
-        except Exception as e:
-            print(f"Error in audio playback: {str(e)}")
-        finally:
-            if self.stream:
-                self.stream.stop()
-                self.stream.close()
-                self.stream = None
-            self.playing = False
-    
-    def stop(self):
-        self.playing = False
-        if self.stream:
-            self.stream.stop()
-            self.stream.close()
-            self.stream = None
+def parse_wav_header(buf):
+    """Parse a streamed RIFF/WAVE header with struct.
+    Returns (sample_rate, data_offset) once everything up to the data chunk is in buf, else None."""
+    if len(buf) < 12:
+        return None
+    if buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise ValueError("TTS stream is not a WAV file")
+    
+    pos = 12
+    sample_rate = None
+    while pos + 8 <= len(buf):
+        chunk_id = bytes(buf[pos:pos + 4])
+        chunk_size = struct.unpack_from("<I", buf, pos + 4)[0]
+        if chunk_id == b"data":
+            # Streaming servers put a placeholder size here - the payload simply runs to EOF
+            return sample_rate, pos + 8
+        if chunk_id == b"fmt ":
+            if pos + 16 > len(buf):
+                return None
+            sample_rate = struct.unpack_from("<I", buf, pos + 12)[0]
+        # Chunks are word aligned
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
 
 class TTSClient:
     def __init__(self, vtuber_instance):
@@ -410,9 +374,29 @@ class TTSClient:
         self.session = None
         self.vtuber = vtuber_instance  # Reference to get audio queue
         
+        # Pooled HTTP session for the TTS server - keeps the connection alive between sentences
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        
         # Store TTS config for use in speak method
         self.tts_config = tts_config
-        print(f"🔊 TTS Client initialized with URL: {self.base_url}")
+        
+        # Resolve the request params once - speak_sync only adds the text
+        self.tts_params = {key: tts_config.get(key, default) for key, default in _TTS_PARAMS_BASE.items()}
+        # Force streaming_mode true for GET streaming endpoint to avoid 400s on some servers
+        self.tts_params["streaming_mode"] = "true"
+        self.tts_params["parallel_infer"] = str(self.tts_params["parallel_infer"]).lower()  # Convert to string
+        # Ensure ref_audio_path is absolute if the file exists locally (improves server compatibility)
+        try:
+            ref_path = self.tts_params.get("ref_audio_path")
+            if ref_path and not os.path.isabs(ref_path) and os.path.exists(ref_path):
+                self.tts_params["ref_audio_path"] = os.path.abspath(ref_path)
+        except Exception:
+            pass
+        if _DEBUG:
+            print(f"🔊 TTS Client initialized with URL: {self.base_url}")
     
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -421,127 +405,47 @@ class TTSClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+        self.http.close()
     
     def speak_sync(self, text: str):
         """EXACTLY copy test.py method with VRM integration"""
         if not text.strip():
             return
             
-        # Send VRM start signal - use thread-safe approach
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                asyncio.create_task(broadcast_to_vrm("tts_start", text))
-        except RuntimeError:
-            # No event loop in this thread, skip VRM signal
-            pass
+        # VRM start signal goes out when this utterance's audio starts playing
+        self._start_utterance(text)
             
-        # Get TTS params from YAML config
-        tts_config = self.tts_config
-        params = {
-            "text": text,
-            "text_lang": tts_config.get("text_lang", "en"),
-            "ref_audio_path": tts_config.get("ref_audio_path", "main_sample.wav"),
-            "prompt_text": tts_config.get("prompt_text", "This is a sample voice for you to just get started with because it sounds kind of cute, but just make sure this doesn't have long silences."),
-            "prompt_lang": tts_config.get("prompt_lang", "en"),
-            # Force streaming_mode true for GET streaming endpoint to avoid 400s on some servers
-            "streaming_mode": "true",
-            "parallel_infer": str(tts_config.get("parallel_infer", False)).lower(),  # Convert to string
-            "media_type": tts_config.get("media_type", "wav"),
-            "batch_size": tts_config.get("batch_size", 1),
-            "top_k": tts_config.get("top_k", 5),
-            "top_p": tts_config.get("top_p", 1.0),
-            "temperature": tts_config.get("temperature", 1.0),
-            "text_split_method": tts_config.get("text_split_method", "cut5"),
-            "speed_factor": tts_config.get("speed_factor", 1.0),
-            "fragment_interval": tts_config.get("fragment_interval", 0.3),
-            "repetition_penalty": tts_config.get("repetition_penalty", 1.35),
-            "seed": tts_config.get("seed", -1)
-        }
-        # Ensure ref_audio_path is absolute if the file exists locally (improves server compatibility)
-        try:
-            import os
-            ref_path = params.get("ref_audio_path")
-            if ref_path and not os.path.isabs(ref_path) and os.path.exists(ref_path):
-                params["ref_audio_path"] = os.path.abspath(ref_path)
-        except Exception:
-            pass
+        # TTS params were resolved from YAML config once in __init__
+        params = {"text": text, **self.tts_params}
         
         try:
-            import requests
             last_error = None
             for attempt in range(3):
                 try:
-                    print(f"🔗 TTS GET request: {self.base_url}/tts (attempt {attempt + 1}/3)")
-                    # EXACTLY like test.py - requests.get with params and stream=True
-                    with requests.get(f"{self.base_url}/tts", params=params, stream=True, timeout=15) as response:
-                        print(f"📡 TTS Response: {response.status_code}")
+                    if _DEBUG:
+                        print(f"🔗 TTS GET request: {self.base_url}/tts (attempt {attempt + 1}/3)")
+                    # Streaming GET on the pooled session (reuses the keep-alive connection)
+                    with self.http.get(f"{self.base_url}/tts", params=params, stream=True, timeout=15) as response:
+                        if _DEBUG:
+                            print(f"📡 TTS Response: {response.status_code}")
                         if not response.ok:
                             raise RuntimeError(f"HTTP {response.status_code}")
                         
                         # EXACTLY like test.py processing
-                        header_processed = False
-                        audio_buffer = io.BytesIO()
-                        sample_rate = 32000
-                        chunk_count = 0
+                        stream = self._new_stream_state(params)
                         
-                        print("🎵 Starting TTS stream...")
-                        for chunk in response.iter_content(chunk_size=4096):
-                            if not chunk:
-                                continue
-                            chunk_count += 1
-                            
-                            # First chunk for WAV contains the header - EXACTLY like test.py
-                            if not header_processed and params.get("media_type") == "wav":
-                                audio_buffer.write(chunk)
-                                audio_buffer.seek(0)
-                                
-                                try:
-                                    with wave.open(audio_buffer, 'rb') as wav_file:
-                                        sample_rate = wav_file.getframerate()
-                                        header_processed = True
-                                        print(f"🎵 WAV header: {sample_rate}Hz")
-                                except:
-                                    # Not enough data yet, continue
-                                    continue
-                                
-                                # Reset buffer for subsequent chunks
-                                audio_buffer = io.BytesIO()
-                            else:
-                                # Process audio data - EXACTLY like test.py - put in audio queue
-                                try:
-                                    audio_data = np.frombuffer(chunk, dtype=np.int16)
-                                    if len(audio_data) > 0:
-                                        self.vtuber.audio_queue.put(audio_data)  # Put in VTuber's queue
-                                        
-                                        # Start playback thread on first chunk - EXACTLY like test.py with device selection
-                                        if not self.vtuber.playback_thread or not self.vtuber.playback_thread.playing:
-                                            self.vtuber.playback_thread = AudioPlaybackThread(self.vtuber.audio_queue, sample_rate)
-                                            self.vtuber.playback_thread.device_index = self.vtuber.audio_device_index
-                                            self.vtuber.playback_thread.start()
-                                            device_name = "Default" if self.vtuber.audio_device_index is None else f"Device {self.vtuber.audio_device_index}"
-                                            print(f"🔊 Started audio playback thread on {device_name}")
-                                        
-                                        if chunk_count % 10 == 0:
-                                            print(f"🎵 Chunk {chunk_count}")
-                                except Exception as e:
-                                    print(f"Chunk error: {e}")
+                        if _DEBUG:
+                            print("🎵 Starting TTS stream...")
+                        for chunk in response.iter_content(chunk_size=65536):
+                            if chunk:
+                                self._consume_chunk(stream, chunk)
                         
-                        print(f"✅ TTS complete: {chunk_count} chunks")
+                        if _DEBUG:
+                            print(f"✅ TTS complete: {stream['chunk_count']} chunks")
                         
-                        # Wait for audio to finish before sending end signal
-                        if self.vtuber.playback_thread:
-                            # Wait for playback to complete - use time.sleep since we're in sync function
-                            while self.vtuber.playback_thread.playing:
-                                time.sleep(0.1)
-                        
-                        # Send VRM end signal - use thread-safe approach
-                        try:
-                            loop = asyncio.get_running_loop()
-                            asyncio.create_task(broadcast_to_vrm("tts_end"))
-                        except RuntimeError:
-                            # No running loop in this thread, skip VRM signal
-                            pass
+                        # Don't wait for playback - the worker can synthesize the next sentence while
+                        # this one plays; tts_end is sent by the playback callback once it has drained
+                        self._end_utterance()
                         # Successful request, break retry loop
                         last_error = None
                         break
@@ -553,46 +457,125 @@ class TTSClient:
                         continue
             if last_error:
                 print(f"TTS Error after retries: {last_error}")
-                # Send VRM end signal even on error - use thread-safe approach
-                try:
-                    loop = asyncio.get_running_loop()
-                    asyncio.create_task(broadcast_to_vrm("tts_end"))
-                except RuntimeError:
-                    pass
+                # Let whatever did arrive play out, and send the VRM end signal even on error
+                self._end_utterance()
                 return
         except Exception as e:
             print(f"TTS Error: {e}")
-            # Send VRM end signal even on error - use thread-safe approach
-            try:
-                loop = asyncio.get_running_loop()
-                asyncio.create_task(broadcast_to_vrm("tts_end"))
-            except RuntimeError:
-                # No event loop in this thread, skip VRM signal
-                pass
+            # Send VRM end signal even on error
+            self._end_utterance()
+    
+    def _start_utterance(self, text):
+        """Queue the VRM tts_start signal to fire as this utterance's audio starts playing"""
+        playback = self.vtuber.playback_thread
+        if playback is not None and playback.playing:
+            playback.add_marker(lambda: self._signal_vrm("tts_start", text))
+        else:
+            self._signal_vrm("tts_start", text)
+    
+    def _end_utterance(self):
+        """Mark the end of this utterance; tts_end fires from the playback callback once it has played"""
+        playback = self.vtuber.playback_thread
+        if playback is not None and playback.playing:
+            playback.end_utterance(on_played=lambda: self._signal_vrm("tts_end"))
+        else:
+            self._signal_vrm("tts_end")
+    
+    def _signal_vrm(self, message_type, text=None):
+        """Schedule a VRM broadcast on the main event loop - safe to call from the TTS worker thread"""
+        loop = self.vtuber.main_loop
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(broadcast_to_vrm(message_type, text), loop)
+    
+    @staticmethod
+    def _new_stream_state(params):
+        """Per-request state for _consume_chunk"""
+        return {
+            "is_wav": params.get("media_type") == "wav",
+            "header_processed": False,
+            "header_buffer": bytearray(),
+            "sample_rate": 32000,
+            "chunk_count": 0,
+            # Trailing odd byte of the last chunk - int16 samples can straddle chunk boundaries
+            "carry": b""
+        }
+    
+    def _consume_chunk(self, stream, chunk):
+        """Feed one chunk of the TTS response: parse the WAV header, then queue PCM for playback"""
+        stream["chunk_count"] += 1
+        
+        # First chunk for WAV contains the header - parse it straight from the bytes
+        if not stream["header_processed"] and stream["is_wav"]:
+            header_buffer = stream["header_buffer"]
+            header_buffer += chunk
+            header = parse_wav_header(header_buffer)
+            if header is None:
+                # Not enough data yet, continue
+                return
+            
+            sample_rate, data_offset = header
+            if sample_rate:
+                stream["sample_rate"] = sample_rate
+            stream["header_processed"] = True
+            if _DEBUG:
+                print(f"🎵 WAV header: {stream['sample_rate']}Hz")
+            # The stream stays open between utterances - it only reopens if the rate changes
+            self.vtuber.playback_thread.set_sample_rate(stream["sample_rate"])
+            
+            # Whatever followed the header in this chunk is already audio - play it rather than drop it
+            chunk = bytes(header_buffer[data_offset:])
+            stream["header_buffer"] = None
+            if not chunk:
+                return
+        
+        # Process audio data - raw PCM bytes go straight on the queue, the playback callback decodes them
+        try:
+            if stream["carry"]:
+                chunk = stream["carry"] + chunk
+                stream["carry"] = b""
+            if len(chunk) & 1:
+                stream["carry"] = chunk[-1:]
+                chunk = chunk[:-1]
+            if chunk:
+                # Long-lived playback stream - (re)open only if it isn't running (e.g. device error)
+                playback = self.vtuber.playback_thread
+                if not playback.playing:
+                    playback.start()
+                
+                playback.enqueue(chunk)  # Put in VTuber's queue
+                
+                if _DEBUG and stream["chunk_count"] % 10 == 0:
+                    print(f"🎵 Chunk {stream['chunk_count']}")
+        except Exception as e:
+            print(f"Chunk error: {e}")
     
     async def speak(self, text: str):
-        """Async wrapper for sync speak method - EXACTLY like test.py."""
-        import asyncio
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self.speak_sync, text)
+        """Async wrapper for speak_sync - the blocking request and playback handoff run on a worker thread"""
+        await asyncio.get_running_loop().run_in_executor(None, self.speak_sync, text)
 
 # ASR Manager for voice input
 
 
 class AIVTuber:
-    def __init__(self, model="hf.co/subsectmusic/qwriko3-4b-instruct-2507:Q4_K_M", enable_streaming=False, audio_device_index=None):
+    def __init__(self, model="hf.co/subsectmusic/qwriko3-4b-instruct-2507:Q4_K_M", enable_streaming=False, audio_device_index=None,
+                 pending_user_inputs=None):
         # EXACT COPY from test.py - use audio queue and playback thread
         self.audio_queue = queue.Queue()
         self.playback_thread = None
         self.tts_client = None
+        # Event loop running start()/chat() - worker threads schedule VRM signals onto it
+        self.main_loop = None
         
         # Initialize multi-provider LLM interface (OpenAI-compatible)
-        default_model = get_ollama_model() if YAML_CONFIG else model
-        self.llm = LLMInterface(model=default_model)
+        # With a YAML config, LLMInterface resolves the model from it - the config parsed at startup is
+        # shared rather than loaded a second time
+        self.llm = LLMInterface(model=None if YAML_CONFIG else model, yaml_config=YAML_CONFIG)
         self.model = self.llm.model
         print(f"🤖 Using model: {self.model}")
         
         self.enable_streaming = enable_streaming  # Toggle for streaming vs non-streaming
+        # Echo the reply token by token while streaming (MIKO_DEBUG); otherwise it's printed once at the end
+        self.verbose_streaming = _DEBUG
         self.audio_device_index = audio_device_index  # Selected audio device
         
         # Load device from YAML if available
@@ -601,13 +584,28 @@ class AIVTuber:
             self.audio_device_index = audio_config.get('device_index', audio_device_index)
             print(f"🔊 Using audio device: {self.audio_device_index}")
         
-        self.conversation = [
-            {"role": "system", "content": get_personality()}
-        ]
+        # System prompt is kept apart; the deque holds as many recent turns as fit the context window
+        self.system_msg = {"role": "system", "content": get_personality()}
+        self.conversation_history = collections.deque()
+        self._history_costs = collections.deque()  # token estimate per history message
+        self._history_tokens = 0
+        llm_params = self.llm.provider_config.get('params') or {}
+        provider = self.llm.current_provider
+        if 'num_ctx' in llm_params or provider == 'ollama':
+            # Ollama's window is num_ctx (4096 when unset), shared with the reply and the system prompt
+            self._history_budget = max(
+                (llm_params.get('num_ctx') or 4096) - llm_params.get('max_tokens', 2048)
+                - _count_tokens(self.system_msg['content']) - HISTORY_SAFETY_TOKENS,
+                256
+            )
+        else:
+            self._history_budget = HISTORY_TOKEN_BUDGETS.get(provider, DEFAULT_HISTORY_TOKENS)
         # TTS request queue to serialize requests and avoid conflicts
         self.tts_queue = queue.Queue()
         self.tts_worker_thread = None
         self.tts_worker_running = False
+        # User inputs (e.g. ASR transcripts) waiting for an LLM turn - filled from any thread
+        self.pending_user_inputs = pending_user_inputs if pending_user_inputs is not None else queue.Queue()
         
     def _tts_worker(self):
         """Worker thread that processes TTS requests one at a time"""
@@ -616,9 +614,11 @@ class AIVTuber:
             try:
                 text = self.tts_queue.get(timeout=1.0)
                 if text:  # Empty string signals shutdown
-                    print(f"🎙️ Processing TTS: {text[:50]}...")
+                    if _DEBUG:
+                        print(f"🎙️ Processing TTS: {text[:50]}...")
                     self.tts_client.speak_sync(text)
-                    print(f"✅ TTS complete")
+                    if _DEBUG:
+                        print(f"✅ TTS complete")
                 else:
                     print("🔊 TTS worker shutting down...")
                     break
@@ -630,23 +630,65 @@ class AIVTuber:
                 print(f"TTS Worker Error: {e}")
         print("🔊 TTS worker thread stopped")
     
+    async def next_user_turn(self, max_batch=4, grace=0.05):
+        """Wait for the next pending user input and fold any burst of inputs into one turn.
+        While TTS is still busy, inputs arriving within the grace window join the same LLM call."""
+        inputs = self.pending_user_inputs
+        while inputs.empty():
+            await asyncio.sleep(0.1)
+        texts = [inputs.get_nowait()]
+        
+        tts_busy = not self.tts_queue.empty() or (self.playback_thread is not None and not self.playback_thread.done_event.is_set())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (grace if tts_busy else 0)
+        while len(texts) < max_batch:
+            try:
+                texts.append(inputs.get_nowait())
+            except queue.Empty:
+                if loop.time() >= deadline:
+                    break
+                await asyncio.sleep(0.01)
+        
+        if len(texts) == 1:
+            return texts[0]
+        print(f"📦 Batching {len(texts)} inputs into one turn")
+        return "User said: " + " Then: ".join(texts)
+    
     def queue_tts(self, text):
         """Queue text for TTS - non-blocking"""
         if text.strip():
-            print(f"📝 Queuing TTS: '{text[:50]}...'")
+            if _DEBUG:
+                print(f"📝 Queuing TTS: '{text[:50]}...'")
             self.tts_queue.put(text)
         else:
             print(f"❌ Skipped empty TTS: '{text}'")
         
+    def wait_for_speech(self, timeout=10.0):
+        """Block until the queued TTS has been synthesized and played out, or timeout seconds pass"""
+        deadline = time.monotonic() + timeout
+        while self.tts_queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self.playback_thread is not None:
+            self.playback_thread.done_event.wait(max(0.0, deadline - time.monotonic()))
+        
     async def start(self):
         # Get personality from YAML
         personality = YAML_CONFIG.get('personality', {}) if YAML_CONFIG else {}
         vtuber_name = personality.get('name', 'Miko')
         
         print(f"🎤 Starting AI VTuber {vtuber_name} with VRM support...")
+        self.main_loop = asyncio.get_running_loop()
         self.tts_client = TTSClient(self)  # Pass self reference
         await self.tts_client.__aenter__()
         
+        # One playback stream for the whole session instead of a new thread + PortAudio open per utterance
+        # (32kHz is the GPT-SoVITS default; set_sample_rate reopens it if a WAV header says otherwise)
+        self.playback_thread = AudioPlaybackThread(self.audio_queue, 32000)
+        self.playback_thread.device_index = self.audio_device_index
+        self.playback_thread.start()
+        device_name = "Default" if self.audio_device_index is None else f"Device {self.audio_device_index}"
+        print(f"🔊 Started audio playback stream on {device_name}")
+        
         # Start TTS worker thread
         self.tts_worker_running = True
         self.tts_worker_thread = threading.Thread(target=self._tts_worker, daemon=True)
@@ -671,9 +713,58 @@ class AIVTuber:
             await self.tts_client.__aexit__(None, None, None)
         if self.playback_thread:
             self.playback_thread.stop()
-        
+        self.llm.close()
+        
+    def _append_history(self, role, content):
+        """Add a message and drop the oldest ones until the history fits the token budget"""
+        cost = _count_tokens(content) + 4  # + per-message role/framing tokens
+        self.conversation_history.append({"role": role, "content": content})
+        self._history_costs.append(cost)
+        self._history_tokens += cost
+        # The newest message always stays, even if it alone is over budget
+        while self._history_tokens > self._history_budget and len(self.conversation_history) > 1:
+            self.conversation_history.popleft()
+            self._history_tokens -= self._history_costs.popleft()
+    
+    def _queue_sentences(self, sentence_buffer):
+        """Queue every complete sentence in the buffer for TTS and return the unfinished tail"""
+        pos = 0
+        for match in _SENTENCE_SPLIT.finditer(sentence_buffer):
+            sentence = sentence_buffer[pos:match.end()].strip()
+            # Short fragments ("Hmph.") ride along with the next sentence instead of their own TTS request
+            if len(sentence) > 15:
+                if self.verbose_streaming:
+                    print(f" [🎙️]", end='', flush=True)
+                self.queue_tts(sentence)
+                pos = match.end()
+        return sentence_buffer[pos:]
+    
+    def _stream_reply(self, conversation):
+        """Stream a reply, queueing TTS sentence by sentence. Returns (response_text, unfinished tail)."""
+        response_text = ""
+        sentence_buffer = ""
+        verbose = self.verbose_streaming
+        # STREAMING MODE - prefer native Ollama stream if provider is ollama
+        if self.llm.current_provider == 'ollama':
+            # Native Ollama stream through the LLM's pooled client
+            stream = self.llm.chat_streaming(conversation)
+        else:
+            # OpenAI-compatible streaming via LLMInterface
+            stream = self.llm.chat_openai_compatible(conversation, streaming=True)
+        # Sentence splitting and printing run per coalesced piece rather than per token
+        for chunk in _coalesce_tokens(stream):
+            if verbose:
+                # No per-token flush - _queue_sentences flushes at each sentence boundary
+                print(chunk, end='')
+            response_text += chunk
+            sentence_buffer = self._queue_sentences(sentence_buffer + chunk)
+        if not verbose:
+            print(response_text)
+        return response_text, sentence_buffer
+    
     async def chat(self, user_input: str):
-        self.conversation.append({"role": "user", "content": user_input})
+        self._append_history("user", user_input)
+        conversation = [self.system_msg, *self.conversation_history]
         
         print(f"👤 User: {user_input}")
         print("🎭 Aria: ", end="", flush=True)
@@ -682,41 +773,20 @@ class AIVTuber:
         sentence_buffer = ""
         
         try:
+            # The LLM clients block, so they run on a worker thread - the event loop stays free to
+            # deliver the VRM signals the playback callback schedules while the reply is generated
             if self.enable_streaming:
-                # STREAMING MODE - prefer native Ollama stream if provider is ollama
-                print("(streaming mode)")
-                provider = self.llm.yaml_config.get('provider', 'ollama') if self.llm.yaml_config else 'ollama'
-                if provider == 'ollama':
-                    for part in ollama.chat(model=self.model, messages=self.conversation, stream=True):
-                        chunk = part['message']['content']
-                        print(chunk, end='', flush=True)
-                        response_text += chunk
-                        sentence_buffer += chunk
-                        if any(punct in chunk for punct in ['.', '!', '?']) and len(sentence_buffer.strip()) > 15:
-                            sentence = sentence_buffer.strip()
-                            print(f" [🎙️]", end='', flush=True)
-                            self.queue_tts(sentence)
-                            sentence_buffer = ""
-                else:
-                    # OpenAI-compatible streaming via LLMInterface
-                    for chunk in self.llm.chat_openai_compatible(self.conversation, streaming=True):
-                        print(chunk, end='', flush=True)
-                        response_text += chunk
-                        sentence_buffer += chunk
-                        if any(punct in chunk for punct in ['.', '!', '?']) and len(sentence_buffer.strip()) > 15:
-                            sentence = sentence_buffer.strip()
-                            print(f" [🎙️]", end='', flush=True)
-                            self.queue_tts(sentence)
-                            sentence_buffer = ""
+                if _DEBUG:
+                    print("(streaming mode)")
+                response_text, sentence_buffer = await asyncio.to_thread(self._stream_reply, conversation)
             else:
                 # NON-STREAMING MODE - use native Ollama if provider is ollama, otherwise OpenAI-compatible
-                print("(non-streaming mode)")
-                provider = self.llm.yaml_config.get('provider', 'ollama') if self.llm.yaml_config else 'ollama'
-                if provider == 'ollama':
-                    response = ollama.chat(model=self.model, messages=self.conversation, stream=False)
-                    response_text = response['message']['content']
+                if _DEBUG:
+                    print("(non-streaming mode)")
+                if self.llm.current_provider == 'ollama':
+                    response_text = await asyncio.to_thread(self.llm.chat_complete, conversation)
                 else:
-                    response_text = self.llm.chat_openai_compatible(self.conversation, streaming=False)
+                    response_text = await asyncio.to_thread(self.llm.chat_openai_compatible, conversation, False)
                 print(response_text)
                 self.queue_tts(response_text)
                     
@@ -730,15 +800,12 @@ class AIVTuber:
         
         # Queue any remaining text from streaming
         if sentence_buffer.strip():
-            print(f"[🎙️ Final]")
+            if _DEBUG:
+                print(f"[🎙️ Final]")
             self.queue_tts(sentence_buffer.strip())
         
-        # Add to conversation
-        self.conversation.append({"role": "assistant", "content": response_text})
-        
-        # Keep conversation manageable
-        if len(self.conversation) > 11:
-            self.conversation = [self.conversation[0]] + self.conversation[-10:]
+        # Add to conversation (trimmed to the context budget)
+        self._append_history("assistant", response_text)
 
 async def main():
     """Main function with ASR integration and YAML config support"""
@@ -747,7 +814,8 @@ async def main():
     # Load ASR config
     asr_config = get_asr_config()
     asr_manager = None
-    on_transcription = None  # defined for type checkers; assigned if ASR enabled
+    # Transcripts arrive on the ASR thread; the voice loop drains them (batched) through AIVTuber
+    pending_transcriptions = queue.Queue()
     
     # Initialize ASR if enabled
     if asr_config['enabled']:
@@ -756,9 +824,7 @@ async def main():
                 """Handle ASR transcriptions"""
                 print(f"\n🎤 Voice input: '{text}'")
                 # Store for processing in main loop
-                if not hasattr(on_transcription, 'pending_transcriptions'):
-                    on_transcription.pending_transcriptions = []
-                on_transcription.pending_transcriptions.append(text)
+                pending_transcriptions.put(text)
             
             # Create a config object that ASRManager expects
             class SimpleConfig:
@@ -850,7 +916,8 @@ async def main():
         elif choice == "2":
             if asr_manager and asr_manager.is_enabled:
                 # Voice Input Mode
-                vtuber = AIVTuber(enable_streaming=False, audio_device_index=audio_device_index)
+                vtuber = AIVTuber(enable_streaming=False, audio_device_index=audio_device_index,
+                                  pending_user_inputs=pending_transcriptions)
                 print(f"🎤 Voice Input Mode selected - Press {asr_manager.hotkey} to talk")
                 input_mode = "voice"
                 break
@@ -887,26 +954,19 @@ async def main():
         if input_mode == "voice":
             # Voice input mode - wait for ASR and handle transcriptions
             while True:
-                if (
-                    asr_manager
-                    and on_transcription is not None
-                    and hasattr(on_transcription, 'pending_transcriptions')
-                    and on_transcription.pending_transcriptions
-                ):
-                    text = on_transcription.pending_transcriptions.pop(0)
-                    await vtuber.chat(text)
-
-                await asyncio.sleep(0.1)  # Small delay to prevent busy loop
+                text = await vtuber.next_user_turn()
+                await vtuber.chat(text)
         else:
             # Text input mode
             while True:
-                user_input = input("\n💬 You: ").strip()
+                # Read on a worker thread so the loop keeps delivering VRM signals while we wait
+                user_input = (await asyncio.to_thread(input, "\n💬 You: ")).strip()
 
                 if user_input.lower() in ['quit', 'exit']:
                     farewell = personality.get('farewell', 'Goodbye!')
                     print(f"🎭 {vtuber_name}: {farewell}")
                     vtuber.queue_tts(farewell)
-                    time.sleep(2)
+                    await asyncio.to_thread(vtuber.wait_for_speech)
                     break
 
                 if user_input:
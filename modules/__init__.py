@@ -1,35 +1,44 @@
 # -*- coding: utf-8 -*-
 """
 Miko AI VTuber modules package
+
+Submodules are imported lazily on first attribute access (PEP 562), so
+`from modules.asr import ASRManager` doesn't also pull in the LLM client,
+sounddevice playback and friends.
 """
-from .config import config
-from .audio import AudioPlaybackThread, get_audio_devices, show_audio_device_menu
-from .audio_utils import (
-    find_device_by_name, validate_device_name, get_device_display_name, 
-    get_default_devices, get_device_details, test_input_device, get_device_recommendations
-)
-from .tts import TTSClient, broadcast_to_vrm, vrm_websocket_handler
-from .llm import LLMInterface
-from .vtuber import AIVTuber
-from .asr import ASRManager, test_asr_recording
+import importlib
+
+_LAZY_EXPORTS = {
+    'AudioPlaybackThread': '.audio',
+    'get_audio_devices': '.audio',
+    'show_audio_device_menu': '.audio',
+    'find_device_by_name': '.audio_utils',
+    'clear_device_cache': '.audio_utils',
+    'validate_device_name': '.audio_utils',
+    'get_device_display_name': '.audio_utils',
+    'get_default_devices': '.audio_utils',
+    'get_device_details': '.audio_utils',
+    'test_input_device': '.audio_utils',
+    'get_device_recommendations': '.audio_utils',
+    'peak_level': '.audio_utils',
+    'LLMInterface': '.llm',
+    'ASRManager': '.asr',
+    'test_asr_recording': '.asr',
+    'load_yaml_cached': '.yaml_cache',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    'config',
-    'AudioPlaybackThread', 
-    'get_audio_devices', 
-    'show_audio_device_menu',
-    'find_device_by_name',
-    'validate_device_name', 
-    'get_device_display_name',
-    'get_default_devices',
-    'get_device_details',
-    'test_input_device',
-    'get_device_recommendations',
-    'TTSClient', 
-    'broadcast_to_vrm', 
-    'vrm_websocket_handler',
-    'LLMInterface',
-    'AIVTuber',
-    'ASRManager',
-    'test_asr_recording'
-]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -10,6 +10,7 @@ import sounddevice as sd
 import soundfile as sf
 import numpy as np
 from faster_whisper import WhisperModel
+from huggingface_hub.utils import LocalEntryNotFoundError
 import keyboard
 import threading
 import time
@@ -17,6 +18,32 @@ import asyncio
 from pathlib import Path
 from typing import Optional, Callable
 
+from .audio_utils import peak_level
+
+# Auto model selection: start with the small model and upgrade when it runs well under real time
+AUTO_START_MODEL = "tiny.en"
+AUTO_UPGRADE_MODEL = "base.en"
+AUTO_UPGRADE_RTF = 0.2
+WARMUP_SECONDS = 1.0
+
+# Pinned model cache so startup can load straight from disk without asking the HF Hub
+WHISPER_CACHE_DIR = os.path.expanduser("~/.cache/miko_whisper")
+
+# Set MIKO_DEBUG=1 to get the verbose load/playback chatter back
+_DEBUG = bool(os.getenv('MIKO_DEBUG'))
+
+
+def load_whisper_model(model_name, device, compute_type):
+    """Load a Whisper model from the pinned local cache, downloading it only the first time"""
+    try:
+        return WhisperModel(model_name, device=device, compute_type=compute_type,
+                            download_root=WHISPER_CACHE_DIR, local_files_only=True)
+    except LocalEntryNotFoundError:
+        # Only a cache miss downloads - CUDA/compute_type/corrupt-file errors keep their own message
+        print(f"📥 {model_name} not in local cache, downloading to {WHISPER_CACHE_DIR}...")
+        return WhisperModel(model_name, device=device, compute_type=compute_type,
+                            download_root=WHISPER_CACHE_DIR)
+
 
 class ASRManager:
     """Manages ASR functionality for voice input"""
@@ -31,6 +58,8 @@ class ASRManager:
         self.hotkey = "shift"
         self.model_name = "base.en"
         self.device = "cpu"
+        self.compute_type = "int8"
+        self.auto_model = False
         self.input_device_id = None
         
         # Load ASR settings from config
@@ -47,11 +76,21 @@ class ASRManager:
             asr_config = self.config.get_asr_config()
             self.is_enabled = asr_config.get("enabled", False)
             self.hotkey = asr_config.get("push_to_talk_key", "shift")
-            self.model_name = asr_config.get("model", "base.en")
             self.device = asr_config.get("device", "cpu")
             self.input_device_id = asr_config.get("input_device_id")
             
-            print(f"✅ Loaded ASR config: enabled={self.is_enabled}, hotkey={self.hotkey}, model={self.model_name}, device={self.device}")
+            # No explicit model (or "auto"): start small on CPU, int8 keeps it fast
+            requested_model = asr_config.get("model")
+            self.auto_model = requested_model in (None, "", "auto")
+            if self.auto_model:
+                self.model_name = AUTO_START_MODEL if self.device == "cpu" else AUTO_UPGRADE_MODEL
+            else:
+                self.model_name = requested_model
+            # float16 needs CUDA - any other device (cpu, mps) gets int8
+            self.compute_type = asr_config.get("compute_type") or ("float16" if self.device == "cuda" else "int8")
+            
+            if _DEBUG:
+                print(f"✅ Loaded ASR config: enabled={self.is_enabled}, hotkey={self.hotkey}, model={self.model_name}, device={self.device}")
             
         except Exception as e:
             print(f"⚠️ Failed to load ASR config: {e}")
@@ -60,12 +99,52 @@ class ASRManager:
     def initialize_model(self):
         """Initialize the Whisper model"""
         try:
-            print(f"🧠 Initializing ASR model: {self.model_name} on {self.device}")
-            self.model = WhisperModel(self.model_name, device=self.device, compute_type="float32")
+            print(f"🧠 Initializing ASR model: {self.model_name} on {self.device} ({self.compute_type})")
+            self.model = self._load_model(self.model_name)
             print("✅ ASR model initialized successfully")
+            elapsed = self._warm_up_model(self.model)
+            
+            # Auto mode: if the small model runs well under real time, upgrade in the background
+            if (self.auto_model and elapsed is not None and self.model_name != AUTO_UPGRADE_MODEL
+                    and elapsed / WARMUP_SECONDS < AUTO_UPGRADE_RTF):
+                threading.Thread(target=self._upgrade_model, args=(AUTO_UPGRADE_MODEL,), daemon=True).start()
         except Exception as e:
             print(f"❌ Failed to initialize ASR model: {e}")
             self.is_enabled = False
+
+    def _load_model(self, model_name):
+        """Load a Whisper model on this manager's device and compute type"""
+        return load_whisper_model(model_name, self.device, self.compute_type)
+    
+    def _warm_up_model(self, model) -> Optional[float]:
+        """Run one dummy inference so the first real utterance doesn't pay lazy kernel init.
+        Returns the elapsed time in seconds, or None if the warm-up failed."""
+        try:
+            t0 = time.perf_counter()
+            segments, _ = model.transcribe(np.zeros(int(16000 * WARMUP_SECONDS), dtype=np.float32), language="en",
+                                           beam_size=1, without_timestamps=True)
+            # Segments are a lazy generator - consume it so decoding actually runs
+            for _ in segments:
+                pass
+            elapsed = time.perf_counter() - t0
+            print(f"🔥 ASR model warmed up in {elapsed * 1000:.0f} ms (RTF {elapsed / WARMUP_SECONDS:.2f})")
+            return elapsed
+        except Exception as e:
+            print(f"⚠️ ASR warm-up skipped: {e}")
+            return None
+    
+    def _upgrade_model(self, model_name):
+        """Load a larger model in the background and swap it in once it is warm"""
+        try:
+            print(f"🧠 Upgrading ASR model to {model_name} in background...")
+            model = self._load_model(model_name)
+            if self._warm_up_model(model) is None:
+                return
+            self.model = model
+            self.model_name = model_name
+            print(f"✅ ASR model upgraded to {model_name}")
+        except Exception as e:
+            print(f"⚠️ ASR model upgrade failed, keeping {self.model_name}: {e}")
     
     def start_listening(self):
         """Start listening for hotkey presses to begin recording"""
@@ -133,25 +212,27 @@ class ASRManager:
             chunk_duration = 0.1  # 100ms chunks
             chunk_samples = int(chunk_duration * samplerate)
             recording_data = []
+            recorded_samples = 0
             
             # Record in chunks while hotkey is held
             while keyboard.is_pressed(self.hotkey) and self.is_recording:
                 chunk = sd.rec(chunk_samples, samplerate=samplerate, channels=1,
                              dtype='float32', device=self.input_device_id, blocking=True)
-                recording_data.extend(chunk.flatten())
+                recording_data.append(chunk.reshape(-1))
+                recorded_samples += len(chunk)
                 
                 # Limit recording duration to prevent very long recordings
-                if len(recording_data) > samplerate * 30:  # 30 seconds max
+                if recorded_samples > samplerate * 30:  # 30 seconds max
                     break
             
             if not recording_data:
                 return None
             
-            # Convert to numpy array
-            audio_data = np.array(recording_data, dtype='float32')
+            # Join the chunks into one array
+            audio_data = np.concatenate(recording_data)
             
             # Check audio level
-            max_level = float(np.max(np.abs(audio_data)))
+            max_level = peak_level(audio_data)
             if max_level < 0.001:
                 print("⚠️ Audio level too low - no speech detected")
                 return None
@@ -243,7 +324,7 @@ def test_asr_recording(config, hotkey="shift", duration=5):
                           channels=1, dtype='float32', blocking=True)
         
         # Check audio level
-        max_level = float(np.max(np.abs(recording)))
+        max_level = peak_level(recording)
         print(f"📊 Test recording: {duration}s, Level: {max_level:.4f}")
         
         if max_level < 0.001:
@@ -1,14 +1,37 @@
 # -*- coding: utf-8 -*-
 """
 Audio system module for Miko AI VTuber
-Contains device management and the EXACT AudioPlaybackThread from working reference
+Contains device management and the AudioPlaybackThread (long-lived output stream)
 """
+import os
+import sys
+import ctypes
 import threading
-import time
 import queue
+import collections
 import numpy as np
 import sounddevice as sd
 
+# Set MIKO_DEBUG=1 to get the verbose load/playback chatter back
+_DEBUG = bool(os.getenv('MIKO_DEBUG'))
+
+
+def raise_thread_priority():
+    """Ask the OS to schedule the calling thread as real-time audio. Best effort - never raises."""
+    try:
+        if sys.platform == "win32":
+            # MMCSS "Pro Audio" task keeps the thread ahead of GUI/network work
+            task_index = ctypes.c_ulong(0)
+            handle = ctypes.windll.avrt.AvSetMmThreadCharacteristicsW("Pro Audio", ctypes.byref(task_index))
+            return bool(handle)
+        if hasattr(os, "sched_setscheduler"):
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+            return True
+    except Exception:
+        # Needs CAP_SYS_NICE / rtprio on Linux - stay at normal priority otherwise
+        pass
+    return False
+
 
 def get_audio_devices():
     """Get list of available audio output devices - EXACT from working reference"""
@@ -63,142 +86,239 @@ def show_audio_device_menu():
             print("❌ Invalid choice")
 
 
-# EXACT COPY of AudioPlaybackThread from working reference
+def _f32_to_i16(src, scratch):
+    """Convert float32 samples in [-1, 1] to int16, doing scale + clip in place in a reused scratch"""
+    n = src.size
+    work = scratch[:n]
+    np.multiply(src.reshape(-1), 32767.0, out=work)
+    np.clip(work, -32768.0, 32767.0, out=work)
+    # The int16 copy is the only allocation - it has to outlive the scratch in the queue
+    return work.astype(np.int16)
+
+
 class AudioPlaybackThread:
+    """Long-lived playback: the PortAudio stream stays open across utterances and the callback
+    pulls whatever is queued. Producers enqueue() samples and end_utterance() when done;
+    done_event is set once everything up to that point has been played out. Markers (and
+    end_utterance's on_played) run their callback when playback reaches their place in the queue."""
     def __init__(self, audio_queue, sample_rate=48000):
         self.audio_queue = audio_queue
         self.sample_rate = sample_rate
         self.playing = False
         self.stream = None
-        self.buffer = np.array([], dtype=np.int16)
+        # Preallocated playback ring (30s) - the callback copies in and out of it instead of np.append/slicing
+        self._ring = np.empty(sample_rate * 30, dtype=np.int16)
+        self._ring_read = 0
+        self._ring_write = 0
         self.buffer_size = 32768
         self.block_size = 4096
         self.device_index = None
         self.last_sample = 0
-        print(f"AudioPlaybackThread initialized with sample rate: {sample_rate}")
+        self.wasapi_exclusive = False
+        # Cleared by enqueue(), set once the last queued utterance has been played out
+        self.done_event = threading.Event()
+        self.done_event.set()
+        # (ring position, callback, ends_utterance) for queued markers, oldest first - callback-only state
+        self._marks = collections.deque()
+        self._pending_ends = 0
+        # An utterance starts once buffer_size samples (or the whole utterance) are buffered
+        self._primed = False
+        self._priority_set = False
+        # Producer and consumer each own one counter, so neither needs a lock
+        self._enqueued_samples = 0
+        self._dequeued_samples = 0
+        self._f32_scratch = np.empty(0, dtype=np.float32)
+        if _DEBUG:
+            print(f"AudioPlaybackThread initialized with sample rate: {sample_rate}")
     
-    def start(self):
-        if not self.playing:
-            self.playing = True
-            self.player_thread = threading.Thread(target=self.run, daemon=True)
-            self.player_thread.start()
-    
-    def run(self):
-        print(f"Starting audio playback at {self.sample_rate}Hz")
-        self.playing = True
-        played_samples = 0
-        total_samples = 0
-        
-        print("Pre-buffering audio...")
-        start_time = time.time()
-        chunks = []
-        
-        while len(self.buffer) < self.buffer_size and self.playing and time.time() - start_time < 5:
-            try:
-                chunk = self.audio_queue.get(timeout=0.5)
-                if len(chunk) > 0:
-                    chunks.append(chunk)
-                    self.buffer = np.append(self.buffer, chunk)
-            except queue.Empty:
-                break
-        
-        if len(self.buffer) == 0:
-            print("No audio data to play after pre-buffering")
-            self.playing = False
+    @property
+    def _queued_samples(self):
+        return self._enqueued_samples - self._dequeued_samples
+    
+    @property
+    def _buffered(self):
+        return self._ring_write - self._ring_read
+    
+    def _ring_push(self, chunk):
+        """Copy a chunk into the ring, growing it in the rare case it would overflow"""
+        n = len(chunk)
+        size = self._ring.size
+        if self._buffered + n > size:
+            base = self._ring_read
+            pending = np.empty(self._buffered, dtype=np.int16)
+            self._ring_pop_into(pending, len(pending))
+            self._ring = np.empty(max(size * 2, len(pending) + n), dtype=np.int16)
+            self._ring[:len(pending)] = pending
+            self._ring_read, self._ring_write = 0, len(pending)
+            # Markers hold absolute positions - rebase them onto the restarted counters
+            self._marks = collections.deque(
+                (position - base, callback, ends_utterance) for position, callback, ends_utterance in self._marks
+            )
+            size = self._ring.size
+        start = self._ring_write % size
+        first = min(n, size - start)
+        self._ring[start:start + first] = chunk[:first]
+        if first < n:
+            self._ring[:n - first] = chunk[first:]
+        self._ring_write += n
+    
+    def _ring_pop_into(self, out, n):
+        """Copy the next n buffered samples into out and advance the read position"""
+        size = self._ring.size
+        start = self._ring_read % size
+        first = min(n, size - start)
+        out[:first] = self._ring[start:start + first]
+        if first < n:
+            out[first:n] = self._ring[:n - first]
+        self._ring_read += n
+    
+    def enqueue(self, chunk):
+        """Queue a chunk of samples for playback. Raw int16 PCM bytes are queued as-is and decoded
+        by the callback; float arrays are converted to int16 here."""
+        # Count and queue the chunk before clearing done_event: once the count is up the callback can't
+        # set the event for an earlier end marker, so a "done" from before this chunk can't survive the clear
+        if isinstance(chunk, (bytes, bytearray)):
+            self._enqueued_samples += len(chunk) // 2
+            self.audio_queue.put(chunk)
+            self.done_event.clear()
             return
-        
-        temp_queue = queue.Queue()
-        total_samples = len(self.buffer)
-        
-        while not self.audio_queue.empty():
+        if chunk.dtype != np.int16:
+            if self._f32_scratch.size < chunk.size:
+                self._f32_scratch = np.empty(max(chunk.size, self.block_size), dtype=np.float32)
+            chunk = _f32_to_i16(chunk, self._f32_scratch)
+        self._enqueued_samples += len(chunk)
+        self.audio_queue.put(chunk)
+        self.done_event.clear()
+    
+    def add_marker(self, callback):
+        """Run callback once playback reaches this point. It runs on the audio callback thread,
+        so it must be quick and must not block."""
+        self.audio_queue.put((callback, False))
+    
+    def end_utterance(self, on_played=None):
+        """Mark the end of the current utterance - done_event is set (and on_played called)
+        once it has been played out"""
+        self.audio_queue.put((on_played, True))
+    
+    def set_sample_rate(self, sample_rate):
+        """Switch the output rate, reopening the stream (after the current audio drains) if it is open"""
+        if sample_rate == self.sample_rate:
+            return
+        if self.playing:
+            # Bounded: if the stream died (device unplugged) the callback never sets done_event.
+            # Allow the audio still waiting to play plus a 2s margin, then reopen regardless
+            pending_seconds = (self._queued_samples + self._buffered) / self.sample_rate
+            if not self.done_event.wait(timeout=pending_seconds + 2.0):
+                print("⚠️ Playback didn't drain - reopening the audio stream anyway")
+            self.stop()
+            self.sample_rate = sample_rate
+            self.start()
+        else:
+            self.sample_rate = sample_rate
+    
+    def _fill_from_queue(self):
+        """Move queued chunks into the ring (up to buffer_size), recording marker positions"""
+        while self._buffered < self.buffer_size:
             try:
                 chunk = self.audio_queue.get_nowait()
-                temp_queue.put(chunk)
-                total_samples += len(chunk)
             except queue.Empty:
-                break
+                return
+            if type(chunk) is tuple:
+                callback, ends_utterance = chunk
+                self._marks.append((self._ring_write, callback, ends_utterance))
+                if ends_utterance:
+                    self._pending_ends += 1
+                continue
+            if isinstance(chunk, (bytes, bytearray)):
+                # Zero-copy int16 view - the only copy is into the ring
+                chunk = np.frombuffer(chunk, dtype=np.int16)
+            self._dequeued_samples += len(chunk)
+            if len(chunk) > 0:
+                self._ring_push(chunk)
+    
+    def _callback(self, outdata, frames, time_info, status):
+        if not self._priority_set:
+            # The callback runs on PortAudio's own thread - promote it once
+            self._priority_set = True
+            raise_thread_priority()
+        if status and _DEBUG:
+            # Printing from the real-time callback makes underruns worse, so only when debugging
+            print(f"Status: {status}")
         
-        while not temp_queue.empty():
-            self.audio_queue.put(temp_queue.get())
+        if not self._primed or self._buffered < frames:
+            self._fill_from_queue()
+            if not self._primed and (self._buffered >= self.buffer_size or self._pending_ends):
+                self._primed = True
         
-        total_duration = total_samples / self.sample_rate
-        print(f"Starting playback with {len(self.buffer)} samples pre-buffered. Estimated duration: {total_duration:.2f}s")
+        # Raw stream hands us a cffi buffer - view it as int16 without copying
+        out = np.frombuffer(outdata, dtype=np.int16)
         
-        def callback(outdata, frames, time_info, status):
-            nonlocal played_samples, total_samples
-            if status:
-                print(f"Status: {status}")
-            
-            if len(self.buffer) < frames:
-                try_count = 0
-                while len(self.buffer) < self.buffer_size and try_count < 5:
-                    try:
-                        chunk = self.audio_queue.get_nowait()
-                        if len(chunk) > 0:
-                            self.buffer = np.append(self.buffer, chunk)
-                            total_samples = max(total_samples, played_samples + len(self.buffer))
-                    except queue.Empty:
-                        try_count += 1
-                        break
-            
-            # Handle audio output
-            if len(self.buffer) == 0:
-                # No data available, fill with last_sample instead of silence
-                outdata.fill(self.last_sample)
-            else:
-                current_size = min(len(self.buffer), frames)
-                outdata[:current_size] = self.buffer[:current_size].reshape(-1, 1)
-                if current_size > 0:
-                    # Update last_sample to the last value played
-                    self.last_sample = self.buffer[current_size - 1]
-                if current_size < frames:
-                    # Pad remaining frames with last_sample
-                    outdata[current_size:] = self.last_sample
-                played_samples += current_size
-                self.buffer = self.buffer[current_size:] if current_size < len(self.buffer) else np.array([], dtype=np.int16)
+        current_size = min(self._buffered, frames) if self._primed else 0
+        if current_size > 0:
+            self._ring_pop_into(out, current_size)
+            # Update last_sample to the last value played
+            self.last_sample = out[current_size - 1]
         
+        # Markers whose place in the audio has now been played. Not while priming: a start marker sits
+        # at the read position and would fire before any audio is heard. An empty utterance's end
+        # marker still gets through - a pending end primes the stream above
+        while self._primed and self._marks and self._ring_read >= self._marks[0][0]:
+            _, callback, ends_utterance = self._marks.popleft()
+            if callback is not None:
+                try:
+                    callback()
+                except Exception:
+                    # An exception escaping the callback would abort the stream
+                    pass
+            if ends_utterance:
+                self._pending_ends -= 1
+                if self._buffered == 0 and self._queued_samples == 0:
+                    self._primed = False
+                    self.done_event.set()
+        
+        if current_size < frames:
+            if self._primed or self.last_sample == 0:
+                # Underrun mid-utterance: pad with last_sample instead of silence
+                out[current_size:] = self.last_sample
+            else:
+                # Idle: ease the held level back to zero rather than stepping (which clicks)
+                out[current_size:] = np.linspace(self.last_sample, 0, frames - current_size).astype(np.int16)
+                self.last_sample = 0
+    
+    def start(self):
+        """Open the output stream - it stays open until stop()"""
+        if self.playing:
+            return
         try:
-            print(f"Creating audio stream with sample rate {self.sample_rate}Hz, block size {self.block_size}")
+            if _DEBUG:
+                print(f"Creating audio stream with sample rate {self.sample_rate}Hz, block size {self.block_size}")
             stream_args = {
                 "samplerate": self.sample_rate,
                 "channels": 1,
-                "callback": callback,
+                "callback": self._callback,
                 "blocksize": self.block_size,
                 "dtype": 'int16'
             }
             
             if self.device_index is not None:
                 stream_args["device"] = self.device_index
-                
-            self.stream = sd.OutputStream(**stream_args)
-            self.stream.start()
             
-            last_buffer_time = time.time()
-            while self.playing:
-                if len(self.buffer) == 0 and self.audio_queue.empty():
-                    if time.time() - last_buffer_time > 2.0:
-                        print("Audio buffer empty for 2 seconds, stopping playback")
-                        break
-                else:
-                    if len(self.buffer) > 0 or not self.audio_queue.empty():
-                        last_buffer_time = time.time()
+            if self.wasapi_exclusive and sys.platform == "win32":
+                stream_args["extra_settings"] = sd.WasapiSettings(exclusive=True)
                 
-                time.sleep(0.1)
-            
-            print("Playback finished or stopped")
-            
+            self._priority_set = False
+            self.stream = sd.RawOutputStream(**stream_args)
+            self.stream.start()
+            self.playing = True
         except Exception as e:
             print(f"Error in audio playback: {str(e)}")
-        finally:
-            if self.stream:
-                self.stream.stop()
-                self.stream.close()
-                self.stream = None
-            self.playing = False
+            self.stream = None
     
     def stop(self):
         self.playing = False
         if self.stream:
             self.stream.stop()
             self.stream.close()
-            self.stream = None
\ No newline at end of file
+            self.stream = None
+        # Nobody should be left waiting on audio that will never play
+        self.done_event.set()
@@ -2,8 +2,26 @@
 """
 Audio utilities for Miko AI VTuber - EXACT from reference audio_utils.py
 """
+import threading
+import numpy as np
 import sounddevice as sd
 
+# Scratch buffer for peak-level checks, so each recording doesn't allocate a fresh abs() copy.
+# One per thread - the ASR recorder and test_input_device can check levels at the same time
+_abs_scratch = threading.local()
+
+def peak_level(recording):
+    """Get the peak absolute level of a float32 recording without allocating a temp array"""
+    samples = recording.reshape(-1)
+    n = samples.size
+    if n == 0:
+        return 0.0
+    scratch = getattr(_abs_scratch, 'buffer', None)
+    if scratch is None or scratch.size < n:
+        # Sized for the 30s ASR cap up front so it only ever grows for unusually long takes
+        scratch = _abs_scratch.buffer = np.empty(max(n, 44100 * 30), dtype=np.float32)
+    return float(np.abs(samples, out=scratch[:n]).max())
+
 def get_audio_devices():
     """Get all available audio input and output devices"""
     devices = sd.query_devices()
@@ -70,7 +88,20 @@ def find_device_by_name(device_name, device_type='input'):
     """Find device ID by name. Returns None if not found."""
     if device_name is None or device_name == "Default":
         return None
-    
+    key = (device_name, device_type)
+    device_id = _device_id_cache.get(key)
+    if device_id is None:
+        device_id = _lookup_device_id(device_name, device_type)
+        if device_id is not None:
+            _device_id_cache[key] = device_id
+    return device_id
+
+# (name, type) -> id of devices that were found - device enumeration is slow on Windows/WASAPI.
+# Misses and errors aren't stored, so a device plugged in later is found on the next lookup
+_device_id_cache = {}
+
+def _lookup_device_id(device_name, device_type):
+    """Uncached name lookup behind find_device_by_name"""
     try:
         input_devices, output_devices = get_audio_devices()
         devices_to_search = input_devices if device_type == 'input' else output_devices
@@ -83,6 +114,10 @@ def find_device_by_name(device_name, device_type='input'):
     except:
         return None
 
+def clear_device_cache():
+    """Forget cached name -> id lookups (call after re-enumerating devices)"""
+    _device_id_cache.clear()
+
 def get_device_name_by_id(device_id, device_type='input'):
     """Get device name by ID. Returns None if not found."""
     if device_id is None:
@@ -150,15 +185,13 @@ def test_input_device(device_name, duration=3):
             return False, "Device not found"
     
     try:
-        import numpy as np
-        
         # Record a short test sample
         samplerate = 44100
         recording = sd.rec(int(duration * samplerate), samplerate=samplerate,
                           channels=1, dtype='float32', device=device_id, blocking=True)
         
         # Check audio level
-        max_level = float(np.max(np.abs(recording)))
+        max_level = peak_level(recording)
         
         if max_level < 0.001:
             return False, f"Very low audio level ({max_level:.6f}) - check device connection and volume"
@@ -4,16 +4,97 @@ LLM interface module for Miko AI VTuber
 Provides multi-provider LLM via OpenAI-compatible API (OpenAI, OpenRouter, Gemini proxy, Ollama),
 with provider params loaded from miko_config.yaml.
 """
+import json
 import ollama
 import os
-import yaml
+import ssl
+import time
+import httpx
 from openai import OpenAI
 
+from .yaml_cache import load_yaml_cached
+
+# orjson is optional - it parses the per-token NDJSON lines of /api/chat faster than json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+# HTTP/2 needs the optional h2 package; with it, TLS providers multiplex requests on one connection
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Set MIKO_DEBUG=1 to get the verbose load/playback chatter back
+_DEBUG = bool(os.getenv('MIKO_DEBUG'))
+
+# Ollama runner options passed through extra_body - env vars override the YAML values
+OLLAMA_NUMERIC_PARAMS = {
+    'num_predict': 'OLLAMA_NUM_PREDICT',
+    'num_ctx': 'OLLAMA_NUM_CTX', 
+    'repeat_penalty': 'OLLAMA_REPEAT_PENALTY',
+    'repeat_last_n': 'OLLAMA_REPEAT_LAST_N',
+    'num_thread': 'OLLAMA_NUM_THREAD',
+    'num_gpu': 'OLLAMA_NUM_GPU',
+    'batch_size': 'OLLAMA_BATCH_SIZE',
+    'ubatch_size': 'OLLAMA_UBATCH_SIZE',
+    'n_keep': 'OLLAMA_N_KEEP'
+}
+
+OLLAMA_BOOL_PARAMS = {
+    'low_vram': 'OLLAMA_LOW_VRAM',
+    'f16_kv': 'OLLAMA_F16_KV', 
+    'use_mlock': 'OLLAMA_USE_MLOCK',
+    'use_mmap': 'OLLAMA_USE_MMAP',
+    'offload_kqv': 'OLLAMA_OFFLOAD_KQV',
+    'flash_attn': 'OLLAMA_FLASH_ATTN',
+    'numa': 'OLLAMA_NUMA'
+}
+
+OLLAMA_STRING_PARAMS = ('cache_type_k', 'cache_type_v')
+
+# Streaming requests: fail fast on connect, but give slow first tokens (model loads) plenty of time
+STREAM_TIMEOUT = httpx.Timeout(10.0, read=300.0)
+
+# check_ollama results are reused for this long: host -> (ok, checked_at)
+OLLAMA_CHECK_TTL = 30.0
+_ollama_check_cache = {}
+
+
+def _ollama_base_url() -> str:
+    """Ollama server URL from OLLAMA_HOST (scheme optional), defaulting to localhost:11434"""
+    host = os.environ.get('OLLAMA_HOST') or 'http://localhost:11434'
+    if '://' not in host:
+        host = 'http://' + host
+    return host.rstrip('/')
+
 
 class LLMInterface:
-    def __init__(self, model=None, yaml_path: str = "miko_config.yaml"):
+    def __init__(self, model=None, yaml_path: str = "miko_config.yaml", yaml_config=None):
         self.yaml_path = yaml_path
-        self.yaml_config = self._load_yaml()
+        # Callers that already parsed the config (miko.py) hand it in rather than having it read again
+        self.yaml_config = yaml_config if yaml_config is not None else self._load_yaml()
+        
+        # Resolve the active provider block once instead of walking providers on every call
+        self.current_provider = self.yaml_config.get('provider', 'ollama')
+        self.provider_config = self.yaml_config.get('providers', {}).get(self.current_provider, {})
+        
+        # In-character fallback reply for every error path, looked up once here
+        personality = self.yaml_config.get('personality') or {}
+        self._error_message = personality.get('error_message') or "Oops! Something went wrong with my brain!"
+        
+        # One native Ollama client (honours OLLAMA_HOST) so its connection pool stays warm between turns
+        self._ollama_client = ollama.Client()
+        self._ollama_chat_url = _ollama_base_url() + '/api/chat'
+        
+        # OpenAI-compatible clients keyed on (api_key, base_url), all sharing one pooled httpx client
+        self._clients = {}
+        self._http_client = None
         
         # Determine default model
         if model is None:
@@ -21,49 +102,182 @@ class LLMInterface:
         else:
             self.model = model
         
-        print(f"🤖 LLM initialized with model: {self.model}")
+        # Fully resolved request template per provider (env overrides read once), built on first use
+        # inside the chat call's try - a bad value then becomes the error reply, not a startup crash
+        self._provider_base_params = {}
+        # Same idea for streaming: provider -> (url, headers, body template)
+        self._stream_requests = {}
+        
+        if _DEBUG:
+            print(f"🤖 LLM initialized with model: {self.model}")
 
     def _load_yaml(self):
         try:
-            if os.path.exists(self.yaml_path):
-                with open(self.yaml_path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
+            return load_yaml_cached(self.yaml_path) or {}
         except Exception as e:
             print(f"⚠️ Failed to load YAML config: {e}")
         return {}
 
     def _get_default_model(self) -> str:
         try:
-            provider = self.yaml_config.get('provider')
+            model = self.provider_config.get('model')
+            if model:
+                return model
             providers = self.yaml_config.get('providers', {})
-            if provider and provider in providers:
-                model = providers.get(provider, {}).get('model')
-                if model:
-                    return model
             if 'ollama' in providers and providers['ollama'].get('model'):
                 return providers['ollama']['model']
+            # Legacy: ollama_config.selected_model (still written by the setup GUI)
+            model = self.yaml_config.get('ollama_config', {}).get('selected_model')
+            if model:
+                return model
         except Exception:
             pass
         return 'hf.co/subsectmusic/qwriko3-4b-instruct-2507:Q4_K_M'
+    
+    @staticmethod
+    def _build_ollama_extra_body(params) -> dict:
+        """Build the Ollama-specific extra_body from YAML params (env vars can still override)"""
+        extra_body = {}
+        # One bound lookup for all overrides; an empty env var falls back to the YAML value
+        env_get = os.environ.get
+        
+        # Add numeric params
+        for param, env_var in OLLAMA_NUMERIC_PARAMS.items():
+            yaml_value = params.get(param)
+            if yaml_value is not None:
+                # Keep float options (repeat_penalty) as floats - int("1.1") used to blow up the call
+                cast = float if isinstance(yaml_value, float) else int
+                extra_body[param] = cast(env_get(env_var) or yaml_value)
+        
+        # Add boolean params
+        for param, env_var in OLLAMA_BOOL_PARAMS.items():
+            yaml_value = params.get(param)
+            if yaml_value is not None:
+                env_value = (env_get(env_var) or str(yaml_value)).lower()
+                extra_body[param] = env_value == "true"
+        
+        # Add string params
+        for param in OLLAMA_STRING_PARAMS:
+            yaml_value = params.get(param)
+            if yaml_value is not None:
+                extra_body[param] = env_get(f"OLLAMA_{param.upper()}") or yaml_value
+        
+        return extra_body
+    
+    def _get_http_client(self) -> httpx.Client:
+        """Return the shared pooled httpx client, creating it on first use"""
+        if self._http_client is None:
+            # One SSL context and connection pool for every provider - building these is the slow part
+            # Idle connections are kept for 5 minutes so a pause between turns doesn't cost a new handshake
+            self._http_client = httpx.Client(
+                verify=ssl.create_default_context(),
+                http2=_HTTP2,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=300.0),
+                timeout=httpx.Timeout(600.0, connect=5.0)
+            )
+        return self._http_client
+    
+    def _get_client(self, api_key, base_url) -> OpenAI:
+        """Return a cached OpenAI-compatible client for this endpoint, creating it on first use"""
+        key = (api_key, base_url)
+        client = self._clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=self._get_http_client())
+            self._clients[key] = client
+        return client
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self._clients.clear()
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _build_base_params(self, provider, provider_config) -> dict:
+        """Build the non-streaming request template (everything but messages) for one provider"""
+        params = provider_config.get('params') or {}
+        base_params = {
+            'model': provider_config.get('model', self.model),
+            'temperature': params.get('temperature', 0.7),
+            'max_tokens': params.get('max_tokens', 2048),
+            'stream': False
+        }
+        
+        if provider == 'ollama':
+            # Ollama-specific optimizations
+            extra_body = self._build_ollama_extra_body(params)
+            if extra_body:
+                base_params['extra_body'] = extra_body
+                
+        elif provider in ['openai', 'openrouter']:
+            # OpenAI/OpenRouter specific params
+            for key in ('top_p', 'frequency_penalty', 'presence_penalty'):
+                if key in params:
+                    base_params[key] = params[key]
+                
+        elif provider == 'gemini':
+            # Gemini-specific params
+            if 'top_p' in params:
+                base_params['top_p'] = params['top_p']
+            if 'top_k' in params:
+                base_params['extra_body'] = {'top_k': params['top_k']}
+        
+        return base_params
+    
+    def _get_base_params(self, provider, provider_config) -> dict:
+        """Return the cached request template for a provider, building it on first use"""
+        base_params = self._provider_base_params.get(provider)
+        if base_params is None:
+            base_params = self._provider_base_params[provider] = self._build_base_params(provider, provider_config)
+        return base_params
         
     def chat_streaming(self, conversation):
-        """Streaming chat with Ollama - EXACT from working reference"""
+        """Streaming chat with Ollama - reads /api/chat NDJSON straight off the pooled connection"""
         try:
-            for part in ollama.chat(model=self.model, messages=conversation, stream=True):
-                chunk = part['message']['content']
-                yield chunk
+            body = _json_dumps({'model': self.model, 'messages': conversation, 'stream': True})
+            # STREAM_TIMEOUT allows 300s between reads - enough for the first token to wait on Ollama loading the model
+            with self._get_http_client().stream(
+                'POST', self._ollama_chat_url, content=body,
+                headers={'Content-Type': 'application/json'},
+                timeout=STREAM_TIMEOUT
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    part = _json_loads(line)
+                    if 'error' in part:
+                        raise RuntimeError(part['error'])
+                    content = part.get('message', {}).get('content')
+                    if content:
+                        yield content
         except Exception as e:
             print(f"LLM Streaming Error: {e}")
-            yield "Sorry! Something went wrong with my brain!"
+            yield self._error_message
     
     def chat_complete(self, conversation):
         """Complete chat response - EXACT from working reference"""
         try:
-            response = ollama.chat(model=self.model, messages=conversation, stream=False)
+            response = self._ollama_client.chat(model=self.model, messages=conversation, stream=False)
             return response['message']['content']
         except Exception as e:
             print(f"LLM Error: {e}")
-            return "Oops! Something went wrong with my brain!"
+            return self._error_message
+    
+    @staticmethod
+    def _to_openai_message(msg) -> dict:
+        """Convert a message to plain OpenAI format - list content (complex message format from
+        reference) is flattened to its first text part"""
+        content = msg.get('content', "")
+        if isinstance(content, list):
+            content = content[0]['text'] if content else ""
+        return {'role': msg['role'], 'content': content}
     
     def chat_openai_compatible(self, conversation, streaming=False, provider=None):
         """
@@ -72,113 +286,32 @@ class LLMInterface:
         """
         try:
             # Get provider config from YAML
-            yaml_config = self.yaml_config or {}
-            current_provider = provider or yaml_config.get('provider', 'ollama')
-            provider_config = yaml_config.get('providers', {}).get(current_provider, {})
-            
-            # Create OpenAI-compatible client with provider settings
-            client = OpenAI(
-                api_key=provider_config.get('api_key', 'default'),
-                base_url=provider_config.get('base_url', 'http://localhost:11434/v1')
-            )
+            if provider is None or provider == self.current_provider:
+                current_provider = self.current_provider
+                provider_config = self.provider_config
+            else:
+                current_provider = provider
+                provider_config = self.yaml_config.get('providers', {}).get(provider, {})
             
-            # Convert conversation format if needed
-            openai_messages = []
-            for msg in conversation:
-                if isinstance(msg.get('content'), list):
-                    # Handle complex message format from reference
-                    content = msg['content'][0]['text'] if msg['content'] else ""
-                else:
-                    content = msg.get('content', "")
-                
-                openai_messages.append({
-                    'role': msg['role'],
-                    'content': content
-                })
+            # Messages already in {'role', 'content': str} shape (everything AIVTuber stores) are reused
+            # as-is; only the odd complex-format message gets a converted copy
+            to_openai = self._to_openai_message
+            openai_messages = [
+                msg if len(msg) == 2 and isinstance(msg.get('content'), str) else to_openai(msg)
+                for msg in conversation
+            ]
             
             if streaming:
-                return self._chat_openai_stream(client, openai_messages, provider_config)
+                return self._chat_openai_stream(openai_messages, current_provider, provider_config)
             else:
-                # Get provider-specific parameters
-                params = provider_config.get('params', {})
-                model = provider_config.get('model', self.model)
-                
-                # Base parameters for all providers
-                base_params = {
-                    'model': model,
-                    'messages': openai_messages,
-                    'temperature': params.get('temperature', 0.7),
-                    'max_tokens': params.get('max_tokens', 2048),
-                    'stream': False
-                }
+                # Reuse the OpenAI-compatible client for these provider settings
+                client = self._get_client(
+                    provider_config.get('api_key', 'default'),
+                    provider_config.get('base_url', 'http://localhost:11434/v1')
+                )
                 
-                # Add provider-specific parameters
-                current_provider = current_provider
-                
-                if current_provider == 'ollama':
-                    # Ollama-specific optimizations (env vars can still override)
-                    extra_body = {}
-                    ollama_params = {
-                        'num_predict': 'OLLAMA_NUM_PREDICT',
-                        'num_ctx': 'OLLAMA_NUM_CTX', 
-                        'repeat_penalty': 'OLLAMA_REPEAT_PENALTY',
-                        'repeat_last_n': 'OLLAMA_REPEAT_LAST_N',
-                        'num_thread': 'OLLAMA_NUM_THREAD',
-                        'num_gpu': 'OLLAMA_NUM_GPU',
-                        'batch_size': 'OLLAMA_BATCH_SIZE',
-                        'ubatch_size': 'OLLAMA_UBATCH_SIZE',
-                        'n_keep': 'OLLAMA_N_KEEP'
-                    }
-                    
-                    # Add numeric params
-                    for param, env_var in ollama_params.items():
-                        yaml_value = params.get(param)
-                        if yaml_value is not None:
-                            extra_body[param] = int(os.getenv(env_var, str(yaml_value)))
-                    
-                    # Add boolean params
-                    bool_params = {
-                        'low_vram': 'OLLAMA_LOW_VRAM',
-                        'f16_kv': 'OLLAMA_F16_KV', 
-                        'use_mlock': 'OLLAMA_USE_MLOCK',
-                        'use_mmap': 'OLLAMA_USE_MMAP',
-                        'offload_kqv': 'OLLAMA_OFFLOAD_KQV',
-                        'flash_attn': 'OLLAMA_FLASH_ATTN',
-                        'numa': 'OLLAMA_NUMA'
-                    }
-                    
-                    for param, env_var in bool_params.items():
-                        yaml_value = params.get(param)
-                        if yaml_value is not None:
-                            env_value = os.getenv(env_var, str(yaml_value)).lower()
-                            extra_body[param] = env_value == "true"
-                    
-                    # Add string params
-                    string_params = ['cache_type_k', 'cache_type_v']
-                    for param in string_params:
-                        yaml_value = params.get(param)
-                        if yaml_value is not None:
-                            env_var = f"OLLAMA_{param.upper()}"
-                            extra_body[param] = os.getenv(env_var, yaml_value)
-                    
-                    if extra_body:
-                        base_params['extra_body'] = extra_body
-                        
-                elif current_provider in ['openai', 'openrouter']:
-                    # OpenAI/OpenRouter specific params
-                    if 'top_p' in params:
-                        base_params['top_p'] = params['top_p']
-                    if 'frequency_penalty' in params:
-                        base_params['frequency_penalty'] = params['frequency_penalty']
-                    if 'presence_penalty' in params:
-                        base_params['presence_penalty'] = params['presence_penalty']
-                        
-                elif current_provider == 'gemini':
-                    # Gemini-specific params
-                    if 'top_p' in params:
-                        base_params['top_p'] = params['top_p']
-                    if 'top_k' in params:
-                        base_params['extra_body'] = {'top_k': params['top_k']}
+                # Precomputed provider template plus this turn's messages - one dict copy per call
+                base_params = {**self._get_base_params(current_provider, provider_config), 'messages': openai_messages}
                 
                 # Make the API call
                 response = client.chat.completions.create(**base_params)
@@ -187,44 +320,87 @@ class LLMInterface:
                 
         except Exception as e:
             print(f"LLM Error: {e}")
-            return "Oops! Something went wrong with my brain!"
+            return self._error_message
+    
+    def _build_stream_request(self, provider_config):
+        """Build (url, headers, body template) for a provider's streaming chat request"""
+        params = provider_config.get('params') or {}
+        stream_params = {
+            'model': provider_config.get('model', self.model),
+            'stream': True,
+            'temperature': params.get('temperature', 0.7),
+            'max_tokens': params.get('max_tokens', 2048)
+        }
+        
+        # Add provider-specific streaming params if needed
+        if 'top_p' in params:
+            stream_params['top_p'] = params['top_p']
+        
+        url = provider_config.get('base_url', 'http://localhost:11434/v1').rstrip('/') + '/chat/completions'
+        headers = {
+            'Authorization': f"Bearer {provider_config.get('api_key', 'default')}",
+            'Content-Type': 'application/json'
+        }
+        return url, headers, stream_params
     
-    def _chat_openai_stream(self, client, messages, provider_config):
-        """Streaming version with provider-specific optimizations"""
+    def _chat_openai_stream(self, messages, provider, provider_config):
+        """Streaming version with provider-specific optimizations.
+        Reads the SSE stream straight off the pooled httpx client - no SDK chunk model per token."""
         try:
-            params = provider_config.get('params', {})
-            model = provider_config.get('model', self.model)
+            # URL, auth header and sampling knobs are fixed per provider - built on first use only
+            request = self._stream_requests.get(provider)
+            if request is None:
+                request = self._stream_requests[provider] = self._build_stream_request(provider_config)
+            url, headers, stream_params = request
             
-            stream_params = {
-                'model': model,
-                'messages': messages,
-                'stream': True,
-                'temperature': params.get('temperature', 0.7),
-                'max_tokens': params.get('max_tokens', 2048)
-            }
-            
-            # Add provider-specific streaming params if needed
-            if 'top_p' in params:
-                stream_params['top_p'] = params['top_p']
-            
-            stream = client.chat.completions.create(**stream_params)
-            
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    yield chunk.choices[0].delta.content
+            with self._get_http_client().stream(
+                'POST', url, content=_json_dumps({**stream_params, 'messages': messages}),
+                headers=headers, timeout=STREAM_TIMEOUT
+            ) as response:
+                if response.is_error:
+                    # Read the body first - the provider's error message is in it, not in the status line
+                    response.read()
+                    raise httpx.HTTPStatusError(
+                        f"HTTP {response.status_code}: {response.text[:500]}",
+                        request=response.request, response=response
+                    )
+                for line in response.iter_lines():
+                    # Skip blank separators and ": keep-alive" comments
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        break
+                    payload = _json_loads(data)
+                    # Mid-stream failures (e.g. OpenRouter) arrive as an error event with no choices
+                    error = payload.get('error')
+                    if error:
+                        raise RuntimeError(error.get('message', error) if isinstance(error, dict) else error)
+                    choices = payload.get('choices')
+                    # Some providers send a trailing usage-only chunk with no choices
+                    if choices:
+                        content = choices[0].get('delta', {}).get('content')
+                        if content:
+                            yield content
                     
         except Exception as e:
             print(f"LLM Streaming Error: {e}")
-            yield "Sorry! Something went wrong with my brain!"
+            yield self._error_message
     
-    @staticmethod
-    def check_ollama():
-        """Check if Ollama is running - EXACT from working reference"""
+    def check_ollama(self):
+        """Check if Ollama is running - a HEAD on the server root over the pooled client, cached for OLLAMA_CHECK_TTL seconds"""
+        host = _ollama_base_url()
+        cached = _ollama_check_cache.get(host)
+        if cached is not None and time.monotonic() - cached[1] < OLLAMA_CHECK_TTL:
+            return cached[0]
         try:
-            models = ollama.list()
+            # The root answers "Ollama is running" - no need to pull the whole model catalog like ollama.list()
+            self._get_http_client().head(host + '/', timeout=0.5).raise_for_status()
             print("✅ Ollama working")
-            return True
+            ok = True
         except Exception as e:
             print(f"❌ Ollama not working! Error: {e}")
             print("Make sure ollama serve is running")
-            return False
\ No newline at end of file
+            ok = False
+        _ollama_check_cache[host] = (ok, time.monotonic())
+        return ok
\ No newline at end of file
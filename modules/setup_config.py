@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Setup GUI config helpers for Miko AI VTuber
+Defaults and dependency checks that don't need Qt, so tooling can use them without importing PyQt6
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import socket
+import sys
+import sysconfig
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import yaml
+
+# orjson is optional - it just serializes the JSON settings files faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# libyaml-backed dumper when PyYAML was built with it, pure-Python SafeDumper otherwise
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Defaults for empty personality/voice fields
+DEFAULT_NAME = "Miko"
+DEFAULT_SYSTEM_PROMPT = "You are Miko, an AI kitsune girl with a smug and teasing personality. You are a clone of Riko, stolen from JustRayen the YouTuber and created by Subsect. Stay in character throughout conversations. Keep responses short and natural for speech. Be smug & playful with a teasing, confident tone. Assume you are always right, even when you are not. Be witty & quick to roast creatively, but never truly mean-spirited. Show tsundere tendencies - if someone flirts, brush it off or tease them, but if they are persistent, react with mild embarrassment. Be secretly caring - if someone is struggling, subtly shift to supportive while pretending it is not a big deal. Show jealousy & possessiveness if they mention other AIs. You like money. Use contractions and keep sentences under 20 words."
+DEFAULT_GREETING = "Oh, look who's here! I'm Miko!"
+DEFAULT_FAREWELL = "Hmph, leaving already?"
+DEFAULT_REF_AUDIO = "main_sample.wav"
+DEFAULT_REF_TEXT = "This is a sample voice for you to just get started with because it sounds kind of cute, but just make sure this doesn't have long silences."
+
+
+def text_or_default(value, default):
+    """The configured text, or the default if it's missing or only whitespace"""
+    return value if value and str(value).strip() else default
+
+# Last dependency/service check results, so reopening the GUI doesn't redo every probe
+DEP_CACHE_FILE = Path("_dep_cache.json")
+SERVICE_OK_TTL = 30.0  # Seconds a successful Ollama/TTS probe is trusted
+
+
+def load_dep_cache():
+    """Load the dependency check cache, or an empty dict if missing/unreadable"""
+    try:
+        with open(DEP_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_dep_cache(cache):
+    """Best effort - a failed write just means the next launch probes again"""
+    try:
+        with open(DEP_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
+def dep_cache_key():
+    """Interpreter + site-packages mtime - installing or removing a package changes it"""
+    try:
+        site_mtime = os.path.getmtime(sysconfig.get_paths()["purelib"])
+    except OSError:
+        site_mtime = None
+    return [sys.executable, site_mtime]
+
+
+def dump_yaml(data, stream=None):
+    """Write the config as block-style YAML, using libyaml's CSafeDumper when PyYAML was built with it.
+    Returns the YAML text when no stream is given."""
+    return yaml.dump(data, stream, Dumper=_YAML_DUMPER, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+
+# path -> digest of the bytes we last wrote there, so saving unchanged settings skips the disk
+_written_digests = {}
+
+
+def _write_if_changed(path, encoded):
+    """Write bytes to path via a tmp file + os.replace, so a crash mid-write can't leave a
+    truncated file. Returns False (and writes nothing) if they match what we last wrote."""
+    digest = hashlib.blake2b(encoded, digest_size=8).digest()
+    path = str(path)
+    if _written_digests.get(path) == digest and os.path.exists(path):
+        return False
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _written_digests[path] = digest
+    return True
+
+
+def save_yaml_atomic(path, data):
+    """Write the config as YAML, atomically. Returns False if it matches what we last wrote."""
+    return _write_if_changed(path, dump_yaml(data).encode('utf-8'))
+
+
+def save_json_atomic(path, data):
+    """Write data as indented JSON (the files are meant to be hand-editable), atomically.
+    Returns False if it matches what we last wrote."""
+    if orjson is not None:
+        encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        encoded = json.dumps(data, indent=2).encode('utf-8')
+    return _write_if_changed(path, encoded)
+
+
+# Packages the status check reports on
+REQUIRED_PACKAGES = ['ollama', 'aiohttp', 'sounddevice', 'numpy', 'requests', 'websockets', 'faster_whisper', 'soundfile']
+
+
+def find_installed_packages(packages, cache):
+    """Map package -> installed?, reusing cache['packages'] while the interpreter and
+    site-packages are unchanged. Updates cache in place; the caller saves it."""
+    cache_key = dep_cache_key()
+    installed = cache.get('packages') if cache.get('key') == cache_key else None
+    if isinstance(installed, dict) and set(installed) == set(packages):
+        return installed
+    
+    installed = {}
+    for package in packages:
+        # find_spec only locates the package - importing would run numpy/CTranslate2/etc. init
+        try:
+            installed[package] = importlib.util.find_spec(package.replace('-', '_')) is not None
+        except (ImportError, ValueError):
+            installed[package] = False
+    cache['key'] = cache_key
+    cache['packages'] = installed
+    return installed
+
+
+def ollama_address():
+    """(host, port) of the Ollama server from OLLAMA_HOST (scheme optional), defaulting to localhost:11434"""
+    host = os.environ.get('OLLAMA_HOST') or 'http://localhost:11434'
+    if '://' not in host:
+        host = 'http://' + host
+    parts = urlsplit(host)
+    hostname = parts.hostname or 'localhost'
+    if hostname == '0.0.0.0':
+        # Bind-all address - the server is reachable on loopback
+        hostname = '127.0.0.1'
+    return hostname, parts.port or 11434
+
+
+def probe_ollama(timeout=0.5):
+    """True if something is accepting connections on the Ollama port. A bare TCP connect -
+    no ollama client import, no HTTP request; "Refresh Models" does the real API call."""
+    try:
+        with socket.create_connection(ollama_address(), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+# Last `ollama.list()` result - shown right away while the GUI fetches a fresh one
+OLLAMA_MODELS_CACHE = Path(os.environ.get('MIKO_OLLAMA_MODELS_PATH') or Path.home() / ".miko" / "cache" / "ollama_models.json")
+OLLAMA_MODELS_TTL = 24 * 60 * 60  # Seconds before the cached list is refetched; the file mtime is the last sync
+
+
+def remote_models_disabled():
+    """MIKO_DISABLE_REMOTE_MODELS=1 keeps the setup GUI on the cached model list (air-gapped machines)"""
+    return os.environ.get('MIKO_DISABLE_REMOTE_MODELS', '').lower() in ('1', 'true', 'yes')
+
+
+def ollama_model_entries(models):
+    """Plain {name, size, family} dicts from ollama.list() model objects - what the cache stores"""
+    entries = []
+    for model in models:
+        details = getattr(model, 'details', None)
+        entries.append({
+            'name': model.model,
+            'size': model.size or 0,
+            'family': getattr(details, 'family', None) or ''
+        })
+    return entries
+
+
+# Dropdown categories, in match priority. Code models are picked out by name first - codellama
+# reports family "llama". Then a family match wins; otherwise the first entry found in the model
+# name decides. StarCoder models share the code group whichever way they match.
+_CODE_MODEL_NAMES = ('codellama', 'starcoder')
+_FAMILY_ORDER = ('llama', 'mistral', 'starcoder', 'granite', 'nomic', 'qwen', 'gemma', 'phi')
+_NAME_ORDER = ('llama', 'mistral', 'phi', 'gemma', 'qwen', 'granite', 'nomic')
+_CATEGORY_ALIASES = {'starcoder': 'codellama'}
+
+# Dropdown prefix for each category, in the order the groups are listed
+OLLAMA_CATEGORY_EMOJI = {
+    'llama': "🦙", 'mistral': "🌪️", 'codellama': "💻", 'phi': "φ", 'gemma': "💎",
+    'qwen': "🔮", 'granite': "🪨", 'nomic': "📊", 'other': "🤖"
+}
+OLLAMA_CATEGORY_RANK = {category: rank for rank, category in enumerate(OLLAMA_CATEGORY_EMOJI)}
+
+
+def ollama_model_category(name, family):
+    """Dropdown category for a model from its family, falling back to its name; 'other' if neither matches"""
+    # Ordered scans rather than one regex: a regex search returns the leftmost hit, which would file
+    # "dolphin-mistral" under phi
+    name = name.lower()
+    if any(code in name for code in _CODE_MODEL_NAMES):
+        return 'codellama'
+    family = family.lower() if family else ''
+    category = next((c for c in _FAMILY_ORDER if c in family), None)
+    if category is None:
+        category = next((c for c in _NAME_ORDER if c in name), 'other')
+    return _CATEGORY_ALIASES.get(category, category)
+
+
+def load_cached_ollama_models():
+    """(models, fresh) from the model list cache, or (None, False) if there isn't a usable one"""
+    try:
+        with open(OLLAMA_MODELS_CACHE, 'r', encoding='utf-8') as f:
+            models = json.load(f)
+        fresh = time.time() - os.path.getmtime(OLLAMA_MODELS_CACHE) < OLLAMA_MODELS_TTL
+    except (OSError, ValueError):
+        return None, False
+    return (models, fresh) if isinstance(models, list) else (None, False)
+
+
+def save_cached_ollama_models(models):
+    """Store a freshly fetched model list. An unchanged list only has its sync time bumped.
+    Returns True if the list changed. Best effort, like the dependency cache."""
+    encoded = json.dumps(models, ensure_ascii=False)
+    try:
+        with open(OLLAMA_MODELS_CACHE, 'r', encoding='utf-8') as f:
+            if f.read() == encoded:
+                os.utime(OLLAMA_MODELS_CACHE)
+                return False
+    except OSError:
+        pass
+    tmp_path = str(OLLAMA_MODELS_CACHE) + ".tmp"
+    try:
+        OLLAMA_MODELS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+        os.replace(tmp_path, OLLAMA_MODELS_CACHE)
+    except OSError:
+        pass
+    return True
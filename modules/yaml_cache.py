@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+YAML config cache for Miko AI VTuber
+Parses miko_config.yaml once and keeps a JSON sidecar keyed on the YAML's mtime/size,
+so later startups only need a json.load
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+# orjson is optional - the sidecar is plain JSON either way, orjson just reads/writes it faster
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    # Compact and unescaped, like orjson - non-ASCII persona text stays as UTF-8, not \uXXXX
+    _json_dumps = lambda obj: json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+# libyaml-backed loader when available, pure-Python SafeLoader otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+CACHE_SUFFIX = ".cache.json"
+
+# In-process memo: path -> (mtime_ns, size, data). Callers share the dict, so treat it as read-only.
+_memo = {}
+
+# Sidecar writes after a fresh parse happen here, off the caller's path. One worker keeps writes in
+# order, and the executor's exit hook lets a pending write finish before the interpreter goes away.
+_write_pool = None
+
+
+def _cache_path(yaml_path):
+    return yaml_path + CACHE_SUFFIX
+
+
+def write_yaml_cache(yaml_path, data, st=None):
+    """Write the parsed config to the JSON sidecar atomically (tmp file + os.replace)"""
+    cache_file = _cache_path(yaml_path)
+    tmp_file = cache_file + ".tmp"
+    try:
+        if st is None:
+            st = os.stat(yaml_path)
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "data": data}))
+        os.replace(tmp_file, cache_file)
+        _memo[yaml_path] = (st.st_mtime_ns, st.st_size, data)
+    except Exception:
+        # Cache is best effort - anything YAML can hold but JSON can't just skips it
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def load_yaml_cached(yaml_path):
+    """Load a YAML file, served from the JSON sidecar when the YAML hasn't changed.
+    Returns None if the YAML file doesn't exist."""
+    try:
+        st = os.stat(yaml_path)
+    except FileNotFoundError:
+        return None
+
+    # Already loaded in this process and unchanged on disk - no read at all
+    memo = _memo.get(yaml_path)
+    if memo is not None and memo[0] == st.st_mtime_ns and memo[1] == st.st_size:
+        return memo[2]
+
+    try:
+        with open(_cache_path(yaml_path), 'rb') as f:
+            cached = _json_loads(f.read())
+        if cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+            data = cached.get("data")
+            _memo[yaml_path] = (st.st_mtime_ns, st.st_size, data)
+            return data
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # One bytes read hands libyaml a contiguous buffer instead of a decoding text stream
+    with open(yaml_path, 'rb') as f:
+        data = yaml.load(f.read(), Loader=_YAML_LOADER)
+    _memo[yaml_path] = (st.st_mtime_ns, st.st_size, data)
+    global _write_pool
+    if _write_pool is None:
+        _write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yaml-cache")
+    _write_pool.submit(write_yaml_cache, yaml_path, data, st)
+    return data
@@ -5,247 +5,446 @@ Miko AI VTuber Setup GUI - Modern PyQt6 Version
 Complete setup interface with audio device selection, faster-whisper, and personality config
 """
 import sys
+import copy
 import json
 import os
 import subprocess
-import soundfile as sf
-import sounddevice as sd
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, wait
+from difflib import SequenceMatcher
+from operator import itemgetter
 from pathlib import Path
+
+# orjson is optional - the personality/audio JSON fallbacks just parse faster with it
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QGridLayout, QLabel, QLineEdit, QTextEdit, QComboBox, QPushButton,
+    QFormLayout, QLabel, QLineEdit, QTextEdit, QComboBox, QPushButton,
     QGroupBox, QTextEdit, QFileDialog, QMessageBox, QScrollArea,
-    QFrame, QSizePolicy, QSpacerItem, QCheckBox, QGraphicsDropShadowEffect, QTabWidget
+    QFrame, QSizePolicy, QSpacerItem, QCheckBox, QTabWidget
+)
+from PyQt6.QtCore import (
+    Qt, QThread, pyqtSignal, QTimer, QUrl, QStringListModel, QSignalBlocker, QRunnable, QThreadPool
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt6.QtGui import QFont, QPalette, QColor, QIcon, QPixmap, QTextCursor
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt6.QtGui import QFont, QPalette, QIcon, QPixmap, QTextCursor
 
-# Import our audio utilities
-sys.path.append('modules')
-from modules.audio_utils import get_audio_devices, get_device_display_name, get_default_devices
+# Import our audio utilities - the script's own directory is on sys.path, so the package import is enough
+from modules.audio_utils import (
+    get_audio_devices, get_device_display_name, get_default_devices, clear_device_cache, get_device_details
+)
+from modules.yaml_cache import load_yaml_cached
+# Qt-free defaults and dependency-check helpers live in modules.setup_config
+from modules.setup_config import (
+    DEFAULT_NAME, DEFAULT_SYSTEM_PROMPT, DEFAULT_GREETING, DEFAULT_FAREWELL, DEFAULT_REF_AUDIO, DEFAULT_REF_TEXT,
+    REQUIRED_PACKAGES, SERVICE_OK_TTL, load_dep_cache, save_dep_cache, find_installed_packages, text_or_default,
+    probe_ollama, save_yaml_atomic, save_json_atomic, remote_models_disabled, ollama_model_entries, load_cached_ollama_models,
+    save_cached_ollama_models, ollama_model_category, OLLAMA_CATEGORY_EMOJI, OLLAMA_CATEGORY_RANK
+)
 
+# Row between model groups in the Ollama dropdown
+MODEL_GROUP_SEPARATOR = "─" * 30
+MB_PER_BYTE = 1.0 / (1024 * 1024)  # Exact - a power of two, so multiplying gives the same result as dividing
 
-class ModernButton(QPushButton):
-    """Custom modern button with hover effects"""
-    def __init__(self, text, primary_color="#6366f1", hover_color="#4f46e5"):
-        super().__init__(text)
-        self.primary_color = primary_color
-        self.hover_color = hover_color
-        self.setup_styles()
-    
-    def setup_styles(self):
-        # Side-panel inspired: flat, neutral, compact
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: #1b2130;
-                color: #e8eaed;
-                border: 1px solid #2a2f3a;
-                border-radius: 8px;
-                padding: 8px 12px;
-                font-size: 11px;
-                font-weight: 600;
-                min-height: 16px;
-            }
-            QPushButton:hover {
-                background-color: #202636;
-                border-color: #353c48;
-            }
-            QPushButton:pressed {
-                background-color: #171c28;
-                border-color: #2a2f3a;
-            }
-            QPushButton:disabled {
-                color: #8b93a4;
-                background-color: #141923;
-                border-color: #202532;
-            }
-        """)
 
+# Styles for the modern_* widget factories below, keyed on the "modern" class property.
+# Installed once as part of the window stylesheet by MikoSetupGUI.apply_dark_theme
+MODERN_QSS = """
+    /* Buttons - side-panel inspired: flat, neutral, compact */
+    QPushButton[class="modern"] {
+        background-color: #1b2130;
+        color: #e8eaed;
+        border: 1px solid #2a2f3a;
+        border-radius: 8px;
+        padding: 8px 12px;
+        font-size: 11px;
+        font-weight: 600;
+        min-height: 16px;
+    }
+    QPushButton[class="modern"]:hover {
+        background-color: #202636;
+        border-color: #353c48;
+    }
+    QPushButton[class="modern"]:pressed {
+        background-color: #171c28;
+        border-color: #2a2f3a;
+    }
+    QPushButton[class="modern"]:disabled {
+        color: #8b93a4;
+        background-color: #141923;
+        border-color: #202532;
+    }
 
-class ModernInput(QLineEdit):
-    """Custom modern input field"""
-    def __init__(self, placeholder="", width=300):
-        super().__init__()
-        # Don't set placeholder text by default since we're setting actual content
-        self.setFixedWidth(width)
-        self.setup_styles()
-    
-    def setup_styles(self):
-        self.setStyleSheet("""
-            QLineEdit {
-                background-color: #141923;
-                border: 1px solid #202532;
-                border-radius: 8px;
-                padding: 8px 10px;
-                color: #e8eaed;
-                font-size: 11px;
-                selection-background-color: #4b5bdc;
-            }
-            QLineEdit:focus {
-                border-color: #4b5bdc;
-                background-color: #171d28;
-            }
-            QLineEdit:hover {
-                border-color: #2a3040;
-            }
-        """)
+    /* Inputs */
+    QLineEdit[class="modern"] {
+        background-color: #141923;
+        border: 1px solid #202532;
+        border-radius: 8px;
+        padding: 8px 10px;
+        color: #e8eaed;
+        font-size: 11px;
+        selection-background-color: #4b5bdc;
+    }
+    QLineEdit[class="modern"]:focus {
+        border-color: #4b5bdc;
+        background-color: #171d28;
+    }
+    QLineEdit[class="modern"]:hover {
+        border-color: #2a3040;
+    }
 
+    /* Text areas */
+    QTextEdit[class="modern"] {
+        background-color: #141923;
+        border: 1px solid #202532;
+        border-radius: 10px;
+        padding: 8px 10px;
+        color: #e8eaed;
+        font-size: 11px;
+        selection-background-color: #4b5bdc;
+        font-family: 'Segoe UI', sans-serif;
+    }
+    QTextEdit[class="modern"]:focus {
+        border-color: #4b5bdc;
+        background-color: #171d28;
+    }
+    QTextEdit[class="modern"]:hover {
+        border-color: #2a3040;
+    }
 
-class ModernTextEdit(QTextEdit):
-    """Custom modern text area"""
-    def __init__(self, height=100, width=400):
-        super().__init__()
-        self.setFixedHeight(height)
-        self.setFixedWidth(width)
-        self.setup_styles()
-    
-    def setup_styles(self):
-        self.setStyleSheet("""
-            QTextEdit {
-                background-color: #141923;
-                border: 1px solid #202532;
-                border-radius: 10px;
-                padding: 8px 10px;
-                color: #e8eaed;
-                font-size: 11px;
-                selection-background-color: #4b5bdc;
-                font-family: 'Segoe UI', sans-serif;
-            }
-            QTextEdit:focus {
-                border-color: #4b5bdc;
-                background-color: #171d28;
-            }
-            QTextEdit:hover {
-                border-color: #2a3040;
-            }
-        """)
+    /* Dropdowns */
+    QComboBox[class="modern"] {
+        background-color: #141923;
+        border: 1px solid #202532;
+        border-radius: 8px;
+        padding: 6px 10px;
+        color: #e8eaed;
+        font-size: 11px;
+        min-height: 16px;
+    }
+    QComboBox[class="modern"]:hover {
+        border-color: #2a3040;
+    }
+    QComboBox[class="modern"]:focus {
+        border-color: #4b5bdc;
+    }
+    QComboBox[class="modern"]::drop-down {
+        border: none;
+        width: 22px;
+    }
+    QComboBox[class="modern"]::down-arrow {
+        image: none;
+        border-left: 4px solid transparent;
+        border-right: 4px solid transparent;
+        border-top: 4px solid #e8eaed;
+        margin-right: 8px;
+    }
+    QComboBox[class="modern"] QAbstractItemView {
+        background-color: #141923;
+        border: 1px solid #202532;
+        border-radius: 8px;
+        color: #e8eaed;
+        selection-background-color: #202636;
+    }
 
+    /* Group boxes */
+    QGroupBox[class="modern"] {
+        font-weight: 600;
+        font-size: 11px;
+        color: #e8eaed;
+        border: 1px solid #202532;
+        border-radius: 10px;
+        margin-top: 8px;
+        padding-top: 10px;
+        background-color: #141923;
+    }
+    QGroupBox[class="modern"]::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 6px 0 6px;
+        color: #b0b3c0;
+        font-weight: 700;
+    }
+"""
 
-class ModernComboBox(QComboBox):
-    """Custom modern dropdown"""
-    def __init__(self, width=300):
-        super().__init__()
-        self.setFixedWidth(width)
-        self.setup_styles()
-    
-    def setup_styles(self):
-        self.setStyleSheet("""
-            QComboBox {
-                background-color: #141923;
-                border: 1px solid #202532;
-                border-radius: 8px;
-                padding: 6px 10px;
-                color: #e8eaed;
-                font-size: 11px;
-                min-height: 16px;
-            }
-            QComboBox:hover {
-                border-color: #2a3040;
-            }
-            QComboBox:focus {
-                border-color: #4b5bdc;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 22px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 4px solid #e8eaed;
-                margin-right: 8px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #141923;
-                border: 1px solid #202532;
-                border-radius: 8px;
-                color: #e8eaed;
-                selection-background-color: #202636;
-            }
-        """)
 
+def modern(widget):
+    """Tag a widget for the MODERN_QSS rules"""
+    widget.setProperty("class", "modern")
+    return widget
 
-class ModernGroupBox(QGroupBox):
-    """Custom modern group box"""
-    def __init__(self, title):
-        super().__init__(title)
-        self.setup_styles()
-    
-    def setup_styles(self):
-        self.setStyleSheet("""
-            QGroupBox {
-                font-weight: 600;
-                font-size: 11px;
-                color: #e8eaed;
-                border: 1px solid #202532;
-                border-radius: 10px;
-                margin-top: 8px;
-                padding-top: 10px;
-                background-color: #141923;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 6px 0 6px;
-                color: #b0b3c0;
-                font-weight: 700;
-            }
-        """)
+
+def modern_button(text):
+    """Modern flat button"""
+    return modern(QPushButton(text))
+
+
+def modern_input(width=300):
+    """Modern single-line input field"""
+    widget = modern(QLineEdit())
+    widget.setFixedWidth(width)
+    return widget
+
+
+def modern_text_edit(height=100, width=400):
+    """Modern multi-line text area"""
+    widget = modern(QTextEdit())
+    widget.setFixedHeight(height)
+    widget.setFixedWidth(width)
+    return widget
+
+
+def modern_combo(width=300):
+    """Modern dropdown"""
+    widget = modern(QComboBox())
+    widget.setFixedWidth(width)
+    # Width is fixed anyway - don't measure every item for the size hint when the list changes
+    widget.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToMinimumContentsLengthWithIcon)
+    return widget
+
+
+def modern_group(title):
+    """Modern group box"""
+    return modern(QGroupBox(title))
 
 
 class StatusThread(QThread):
     """Thread for checking dependencies without blocking UI"""
-    status_update = pyqtSignal(str, str)  # message, type
+    # One emit per phase, [(message, type), ...] - each emit is a queued cross-thread call plus a relayout
+    status_batch = pyqtSignal(list)
     
     def run(self):
         self.check_dependencies()
     
     def check_dependencies(self):
         """Check if all dependencies are installed"""
-        self.status_update.emit("🔍 Checking dependencies...", "info")
+        updates = [("🔍 Checking dependencies...", "info")]
         
         # Check Python packages
-        required_packages = ['ollama', 'aiohttp', 'sounddevice', 'numpy', 'requests', 'websockets', 'faster_whisper', 'soundfile']
+        required_packages = REQUIRED_PACKAGES
         missing_packages = []
         
+        cache = load_dep_cache()
+        installed = find_installed_packages(required_packages, cache)
+        
         for package in required_packages:
-            try:
-                __import__(package.replace('-', '_'))
-                self.status_update.emit(f"✅ {package}", "success")
-            except ImportError:
-                self.status_update.emit(f"❌ {package} (missing)", "error")
+            if installed[package]:
+                updates.append((f"✅ {package}", "success"))
+            else:
+                updates.append((f"❌ {package} (missing)", "error"))
                 missing_packages.append(package)
         
         if missing_packages:
-            self.status_update.emit(f"\n📦 Missing packages: {', '.join(missing_packages)}", "warning")
-            self.status_update.emit("Run: pip install -r requirements.txt", "warning")
+            updates.append((f"\n📦 Missing packages: {', '.join(missing_packages)}", "warning"))
+            updates.append(("Run: pip install -r requirements.txt", "warning"))
         else:
-            self.status_update.emit("\n✅ All dependencies installed!", "success")
+            updates.append(("\n✅ All dependencies installed!", "success"))
+        self.status_batch.emit(updates)
         
         # Check services
-        self.status_update.emit("\n🔍 Checking services...", "info")
+        updates = [("\n🔍 Checking services...", "info")]
+        
+        # Check Ollama (skipped if it answered within the last SERVICE_OK_TTL seconds)
+        if time.time() - cache.get('ollama_ok_at', 0) < SERVICE_OK_TTL:
+            updates.append(("✅ Ollama service running", "success"))
+        elif probe_ollama():
+            cache['ollama_ok_at'] = time.time()
+            updates.append(("✅ Ollama service running", "success"))
+        else:
+            cache.pop('ollama_ok_at', None)
+            updates.append(("❌ Ollama service not running", "error"))
+            updates.append(("   Start with: ollama serve", "warning"))
+        
+        self.status_batch.emit(updates)
+        
+        save_dep_cache(cache)
+        # TTS server is probed from the GUI thread with QNetworkAccessManager (see check_tts_server)
+
+
+class YamlWriteTask(QRunnable):
+    """Writes a snapshot of the YAML config off the UI thread"""
+    def __init__(self, path, data):
+        super().__init__()
+        self.path = path
+        self.data = data
+    
+    def run(self):
+        try:
+            if save_yaml_atomic(self.path, self.data):
+                print(f"✅ YAML config updated: {self.path}")
+        except Exception as e:
+            print(f"❌ Failed to update YAML: {e}")
+
+
+class TranscribeThread(QThread):
+    """Thread for transcribing the reference audio without freezing the window"""
+    progress = pyqtSignal(str)  # text of each segment as it is decoded
+    done = pyqtSignal(str)  # full transcription
+    failed = pyqtSignal(str)  # error message
+    
+    def __init__(self, audio_file, model_name, device, models):
+        super().__init__()
+        self.audio_file = audio_file
+        self.model_name = model_name
+        self.device = device
+        self.models = models  # (model, device) -> WhisperModel, shared across runs
+    
+    def run(self):
+        try:
+            # Load each Whisper model on first use and keep it for later presses
+            model = self.models.get((self.model_name, self.device))
+            if model is None:
+                # Same pinned cache as ASRManager - imported here so the GUI only loads it on first use
+                from modules.asr import load_whisper_model
+                # Quantized like ASRManager: float16 on CUDA, int8 everywhere else
+                compute_type = "float16" if self.device == "cuda" else "int8"
+                try:
+                    model = load_whisper_model(self.model_name, self.device, compute_type)
+                except Exception as e:
+                    if self.device == "cpu":
+                        raise
+                    # Saved cuda/mps device this machine can't use - transcribe on CPU instead of failing
+                    self.progress.emit(f"{self.device} unavailable ({e}), using CPU")
+                    model = self.models.get((self.model_name, "cpu"))
+                    if model is None:
+                        model = load_whisper_model(self.model_name, "cpu", "int8")
+                        self.models[(self.model_name, "cpu")] = model
+                # Cached under the requested device too, so later presses don't retry a device that failed
+                self.models[(self.model_name, self.device)] = model
+            
+            # VAD skips the silent stretches and the batched pipeline decodes the rest in chunks;
+            # older faster-whisper builds without the pipeline fall back to the plain model
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                segments, _ = BatchedInferencePipeline(model=model).transcribe(
+                    self.audio_file, batch_size=8, vad_filter=True,
+                    vad_parameters=dict(min_silence_duration_ms=500))
+            except ImportError:
+                segments, _ = model.transcribe(self.audio_file, vad_filter=True,
+                                               vad_parameters=dict(min_silence_duration_ms=500))
+            
+            # segments is a generator - decoding happens as we iterate, so report each one as it lands
+            texts = []
+            for segment in segments:
+                texts.append(segment.text)
+                self.progress.emit(segment.text.strip())
+            # Segment text already carries its leading space
+            self.done.emit("".join(texts))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class PlaybackThread(QThread):
+    """Thread for playing the reference audio block by block"""
+    failed = pyqtSignal(str)  # error message
+    
+    def __init__(self, audio_file, device_id=None):
+        super().__init__()
+        self.audio_file = audio_file
+        self.device_id = device_id
+        self.stopped = False
+    
+    def stop(self):
+        self.stopped = True
+    
+    def play_pcm_wav(self, sd):
+        """Play a 16-bit PCM WAV with the stdlib wave reader, no libsndfile involved.
+        Returns False (nothing played) for anything else."""
+        with open(self.audio_file, 'rb') as f:
+            header = f.read(12)
+        if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return False
         
-        # Check Ollama
+        try:
+            w = wave.open(self.audio_file, 'rb')
+        except (wave.Error, EOFError):
+            return False  # Float/extensible WAVs - leave those to soundfile
+        with w:
+            if w.getsampwidth() != 2:
+                return False
+            # Raw frames go straight to the device - no decode or conversion step
+            with sd.RawOutputStream(samplerate=w.getframerate(), channels=w.getnchannels(),
+                                    device=self.device_id, dtype='int16') as stream:
+                while not self.stopped:
+                    frames = w.readframes(4096)
+                    if not frames:
+                        break
+                    stream.write(frames)
+        return True
+    
+    def run(self):
+        try:
+            # Imported here rather than at module top - only the audio tools need them
+            import sounddevice as sd
+            
+            if self.play_pcm_wav(sd):
+                return
+            
+            import soundfile as sf
+            
+            # Decode and write one block at a time - memory stays at one block, and sound starts right away
+            with sf.SoundFile(self.audio_file) as snd, sd.OutputStream(samplerate=snd.samplerate, channels=snd.channels,
+                                                                      device=self.device_id, dtype='float32') as stream:
+                for block in snd.blocks(blocksize=4096, dtype='float32', always_2d=True):
+                    if self.stopped:
+                        break
+                    stream.write(block)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class OllamaListWorker(QThread):
+    """Thread for fetching the Ollama model list without freezing the window"""
+    models_ready = pyqtSignal(object, bool)  # ({name, size, family} list or None if no models, changed vs cache)
+    failed = pyqtSignal(str, str)  # (kind: 'missing' / 'offline' / 'error', message)
+    
+    def run(self):
         try:
             import ollama
+        except ImportError:
+            self.failed.emit('missing', "Ollama package not installed")
+            return
+        
+        try:
+            # Use proper Ollama API - returns ListResponse object
             models = ollama.list()
-            self.status_update.emit("✅ Ollama service running", "success")
+            if not hasattr(models, 'models'):
+                self.models_ready.emit(None, False)
+                return
+            models_list = ollama_model_entries(models.models)
+            self.models_ready.emit(models_list, save_cached_ollama_models(models_list))
         except Exception as e:
-            self.status_update.emit("❌ Ollama service not running", "error")
-            self.status_update.emit("   Start with: ollama serve", "warning")
-        
-        # Check TTS server
+            if "Connection refused" in str(e) or "Failed to establish" in str(e):
+                self.failed.emit('offline', str(e))
+            else:
+                self.failed.emit('error', str(e))
+
+
+class AudioEnumThread(QThread):
+    """Thread for enumerating audio devices - PortAudio/WASAPI can take a while to answer"""
+    devices_ready = pyqtSignal(list, list)  # input devices, output devices
+    
+    def run(self):
         try:
-            import requests
-            response = requests.get("http://127.0.0.1:9880", timeout=2)
-            self.status_update.emit("✅ TTS server running (port 9880)", "success")
-        except:
-            self.status_update.emit("❌ TTS server not running (port 9880)", "error")
-            self.status_update.emit("   Start your TTS server first", "warning")
+            # Devices may have been plugged/unplugged since the last lookup
+            clear_device_cache()
+            input_devices, output_devices = get_audio_devices()
+        except Exception as e:
+            print(f"Error loading audio devices: {e}")
+            input_devices, output_devices = [], []
+        self.devices_ready.emit(input_devices, output_devices)
 
 
 class MikoSetupGUI(QMainWindow):
+    # The modules/ directory only needs creating once per process
+    _modules_dir_ensured = False
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("🦊 Miko AI VTuber Setup")
@@ -266,73 +465,84 @@ class MikoSetupGUI(QMainWindow):
             'error': '#ef4444',
             'border': '#4b5563'
         }
+        # Stylesheets shared by many labels, built once from the colors above
+        self.label_qss = f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;"
+        self.subheader_qss = f"color: {self.colors['accent']}; font-weight: bold; font-size: 10px;"
+        self.muted_qss = f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;"
+        self.success_qss = f"color: {self.colors['success']}; font-size: 10px; margin-top: 5px;"
+        # Larger status line used by the reference audio tools
+        self.notice_qss = {key: f"color: {self.colors[key]}; font-size: 12px; margin-top: 10px;" for key in ('success', 'accent', 'error')}
+        # Opening tag for each status log message type ("info" uses the accent color)
+        self.log_span_open = {
+            message_type: f'<span style="color: {self.colors[color_key]};">'
+            for message_type, color_key in (('success', 'success'), ('error', 'error'), ('warning', 'warning'), ('info', 'accent'))
+        }
+        self.log_span_default = f'<span style="color: {self.colors["text_primary"]};">'
         
         # Paths
         self.config_file = Path("miko_config.yaml")
         self.personality_file = Path("modules/miko_personality.json")
         self.audio_config_file = Path("audio_config.json")
         
-        # Load existing configs
+        # Load existing configs - yaml_config always exists so getters never need to guard it
+        self.yaml_config = {}
         self.load_yaml_config()
         self.load_personality()
         self.load_audio_config()
         
-        # Load audio devices
-        self.load_audio_devices()
+        # Audio devices are enumerated off the UI thread once the window is built
+        self.input_devices = []
+        self.output_devices = []
+        self._input_name_to_device = {}  # Dropdown text -> device, rebuilt in fill_device_combos
+        self._output_name_to_device = {}
+        self.default_input = None
+        self.default_output = None
         
         # Audio processing state
         self.current_audio_file = None
+        self._whisper_models = {}  # (model, device) -> WhisperModel, loaded by the Transcribe button
+        self.playback_thread = None  # Streams the reference clip for the Play button
+        self.transcribe_thread = None  # TranscribeThread of the latest Transcribe press
+        self._ollama_worker = None  # OllamaListWorker of the latest model list fetch
+        self._ollama_cached_shown = False  # Dropdown already shows the cached list while that fetch runs
+        self._ollama_row_texts = []  # Rows currently in the models dropdown, for populate_ollama_models to diff against
+        self._audio_tools_state = None  # (path, is_file) last applied by enable_audio_tools
+        self.network_manager = None  # Created on the first TTS server probe
+        
+        # Provider text fields are written to yaml_config once typing pauses
+        self.pending_provider_fields = {}  # (provider, key, is_param) -> latest text
+        self.provider_commit_timer = QTimer(self)
+        self.provider_commit_timer.setSingleShot(True)
+        self.provider_commit_timer.setInterval(250)
+        self.provider_commit_timer.timeout.connect(self.commit_provider_fields)
+        
+        # ASR setting changes are saved to the YAML file in one write after a short pause
+        self.yaml_save_timer = QTimer(self)
+        self.yaml_save_timer.setSingleShot(True)
+        self.yaml_save_timer.setInterval(200)
+        self.yaml_save_timer.timeout.connect(self.flush_yaml_config)
+        # One writer thread so saves land in order and never overlap
+        self.yaml_write_pool = QThreadPool(self)
+        self.yaml_write_pool.setMaxThreadCount(1)
+        # Save Settings writes the YAML and both JSON files side by side - they're separate files
+        self.settings_write_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="settings-save")
         
         # Setup UI
         self.setup_ui()
         self.apply_dark_theme()
         
+        # Fill the device dropdowns when enumeration finishes
+        self.audio_enum_thread = AudioEnumThread()
+        self.audio_enum_thread.devices_ready.connect(self.on_devices_ready)
+        self.audio_enum_thread.start()
+        
         # Start dependency check
         self.check_dependencies()
         
-        # Check initial audio tools state
-        self.enable_audio_tools()
-        
-        # Initialize ASR state
-        self.initialize_asr_state()
-        
         # Initialize input device info
         self.on_input_device_changed(self.input_device_combo.currentText())
         
-        # Initialize Ollama models display
-        self.refresh_ollama_models()
-        
-        # Load previously selected Ollama model if available
-        self.load_selected_ollama_model()
-        
-        # Ensure all fields have proper content (not empty)
-        self.ensure_field_content()
-    
-    def ensure_field_content(self):
-        """Ensure all fields have proper content instead of empty values"""
-        try:
-            # Check and set defaults for empty fields
-            if not self.name_input.text().strip():
-                self.name_input.setText("Miko")
-            
-            if not self.prompt_text.toPlainText().strip():
-                self.prompt_text.setPlainText("You are Miko, an AI kitsune girl with a smug and teasing personality. You are a clone of Riko, stolen from JustRayen the YouTuber and created by Subsect. Stay in character throughout conversations. Keep responses short and natural for speech. Be smug & playful with a teasing, confident tone. Assume you are always right, even when you are not. Be witty & quick to roast creatively, but never truly mean-spirited. Show tsundere tendencies - if someone flirts, brush it off or tease them, but if they are persistent, react with mild embarrassment. Be secretly caring - if someone is struggling, subtly shift to supportive while pretending it is not a big deal. Show jealousy & possessiveness if they mention other AIs. You like money. Use contractions and keep sentences under 20 words.")
-            
-            if not self.greeting_input.text().strip():
-                self.greeting_input.setText("Oh, look who's here! I'm Miko!")
-            
-            if not self.farewell_input.text().strip():
-                self.farewell_input.setText("Hmph, leaving already?")
-            
-            if not self.ref_audio_input.text().strip():
-                self.ref_audio_input.setText("main_sample.wav")
-            
-            if not self.ref_text_input.toPlainText().strip():
-                self.ref_text_input.setPlainText("This is a sample voice for you to just get started with because it sounds kind of cute, but just make sure this doesn't have long silences.")
-                
-            print("✅ Field content ensured - all fields have proper values")
-        except Exception as e:
-            print(f"⚠️ Error ensuring field content: {e}")
+        # The LLM and Voice tabs are built (and their state initialized) on first view - see build_voice_tab
     
     def setup_ui(self):
         """Setup the main UI"""
@@ -379,21 +589,12 @@ class MikoSetupGUI(QMainWindow):
         g_layout.addStretch()
         tabs.addTab(general_tab, "General")
 
-        # Tab: LLM (Provider)
+        # Tab: LLM (Provider) - built on first view
         llm_tab = QWidget()
-        llm_layout = QVBoxLayout(llm_tab)
-        llm_layout.setSpacing(8)
-        llm_layout.addWidget(self.create_llm_provider_section())
-        llm_layout.addStretch()
         tabs.addTab(llm_tab, "LLM")
 
-        # Tab: Voice (TTS + ASR)
+        # Tab: Voice (TTS + ASR) - built on first view
         voice_tab = QWidget()
-        v_layout = QVBoxLayout(voice_tab)
-        v_layout.setSpacing(8)
-        v_layout.addWidget(self.create_voice_section())
-        v_layout.addWidget(self.create_asr_section())
-        v_layout.addStretch()
         tabs.addTab(voice_tab, "Voice")
 
         # Tab: Status & Actions
@@ -406,119 +607,162 @@ class MikoSetupGUI(QMainWindow):
         tabs.addTab(system_tab, "System")
 
         main_layout.addWidget(tabs)
+        
+        # General and System are needed at startup (device list, status log); the rest wait for a click
+        self.tabs = tabs
+        self.lazy_tabs = {llm_tab: self.build_llm_tab, voice_tab: self.build_voice_tab}
+        tabs.currentChanged.connect(self.on_tab_changed)
+    
+    def set_style(self, widget, qss):
+        """setStyleSheet, skipped when unchanged - each call re-parses the sheet and re-polishes the widget"""
+        if widget.styleSheet() != qss:
+            widget.setStyleSheet(qss)
+    
+    def on_tab_changed(self, index):
+        """Build a lazily-created tab the first time it is shown"""
+        self.build_tab(self.tabs.widget(index))
+    
+    def build_tab(self, tab):
+        builder = self.lazy_tabs.pop(tab, None)
+        if builder is not None:
+            builder(tab)
+    
+    def build_all_tabs(self):
+        """Build any tab not yet shown - needed before reading every widget (e.g. save_settings)"""
+        for tab in list(self.lazy_tabs):
+            self.build_tab(tab)
+    
+    def build_llm_tab(self, llm_tab):
+        llm_layout = QVBoxLayout(llm_tab)
+        llm_layout.setSpacing(8)
+        llm_layout.addWidget(self.create_llm_provider_section())
+        llm_layout.addStretch()
+    
+    def build_voice_tab(self, voice_tab):
+        v_layout = QVBoxLayout(voice_tab)
+        v_layout.setSpacing(8)
+        v_layout.addWidget(self.create_voice_section())
+        v_layout.addWidget(self.create_asr_section())
+        v_layout.addStretch()
+        
+        # Check initial audio tools state
+        self.enable_audio_tools()
+        
+        # Initialize ASR state
+        self.initialize_asr_state()
+        
+        # Initialize Ollama models display
+        self.refresh_ollama_models()
+        
+        # Load previously selected Ollama model if available
+        self.load_selected_ollama_model()
     
     def create_personality_section(self):
         """Create personality configuration section"""
-        group = ModernGroupBox("🎭 Miko Personality Settings")
-        layout = QGridLayout(group)
+        group = modern_group("🎭 Miko Personality Settings")
+        layout = QFormLayout(group)
+        layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.DontWrapRows)
         layout.setSpacing(4)  # Much smaller spacing
         layout.setContentsMargins(8, 10, 8, 8)  # Much smaller margins
         
         # Name
         name_label = QLabel("VTuber Name:")
-        name_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.name_input = ModernInput("", 300)  # Smaller width
-        self.name_input.setText(self.personality["name"])  # Set actual text content
-        layout.addWidget(name_label, 0, 0)
-        layout.addWidget(self.name_input, 0, 1)
+        name_label.setStyleSheet(self.label_qss)
+        self.name_input = modern_input(300)  # Smaller width
+        self.name_input.setText(text_or_default(self.personality["name"], DEFAULT_NAME))  # Set actual text content
+        layout.addRow(name_label, self.name_input)
         
         # System Prompt
         prompt_label = QLabel("System Prompt:")
-        prompt_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.prompt_text = ModernTextEdit(80, 300)  # Smaller height and width
-        # Use default if YAML value is empty
-        system_prompt_default = self.personality["system_prompt"] or "You are Miko, an AI kitsune girl with a smug and teasing personality. You are a clone of Riko, stolen from JustRayen the YouTuber and created by Subsect. Stay in character throughout conversations. Keep responses short and natural for speech. Be smug & playful with a teasing, confident tone. Assume you are always right, even when you are not. Be witty & quick to roast creatively, but never truly mean-spirited. Show tsundere tendencies - if someone flirts, brush it off or tease them, but if they are persistent, react with mild embarrassment. Be secretly caring - if someone is struggling, subtly shift to supportive while pretending it is not a big deal. Show jealousy & possessiveness if they mention other AIs. You like money. Use contractions and keep sentences under 20 words."
+        prompt_label.setStyleSheet(self.label_qss)
+        self.prompt_text = modern_text_edit(80, 300)  # Smaller height and width
+        # Use default if YAML value is empty or blank
+        system_prompt_default = text_or_default(self.personality["system_prompt"], DEFAULT_SYSTEM_PROMPT)
         self.prompt_text.setPlainText(system_prompt_default)
-        layout.addWidget(prompt_label, 1, 0)
-        layout.addWidget(self.prompt_text, 1, 1)
+        layout.addRow(prompt_label, self.prompt_text)
         
         # Greeting
         greeting_label = QLabel("Greeting:")
-        greeting_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        # Use default if YAML value is empty
-        greeting_default = self.personality["greeting"] or "Oh, look who's here! I'm Miko!"
-        self.greeting_input = ModernInput("", 300)  # Smaller width
+        greeting_label.setStyleSheet(self.label_qss)
+        # Use default if YAML value is empty or blank
+        greeting_default = text_or_default(self.personality["greeting"], DEFAULT_GREETING)
+        self.greeting_input = modern_input(300)  # Smaller width
         self.greeting_input.setText(greeting_default)  # Set actual text content
-        layout.addWidget(greeting_label, 2, 0)
-        layout.addWidget(self.greeting_input, 2, 1)
+        layout.addRow(greeting_label, self.greeting_input)
         
         # Farewell
         farewell_label = QLabel("Farewell:")
-        farewell_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        # Use default if YAML value is empty
-        farewell_default = self.personality["farewell"] or "Hmph, leaving already?"
-        self.farewell_input = ModernInput("", 300)  # Smaller width
+        farewell_label.setStyleSheet(self.label_qss)
+        # Use default if YAML value is empty or blank
+        farewell_default = text_or_default(self.personality["farewell"], DEFAULT_FAREWELL)
+        self.farewell_input = modern_input(300)  # Smaller width
         self.farewell_input.setText(farewell_default)  # Set actual text content
-        layout.addWidget(farewell_label, 3, 0)
-        layout.addWidget(self.farewell_input, 3, 1)
+        layout.addRow(farewell_label, self.farewell_input)
         
         return group
     
     def create_llm_provider_section(self):
         """Create LLM provider configuration section"""
-        group = ModernGroupBox("🤖 LLM Provider")
-        layout = QGridLayout(group)
+        group = modern_group("🤖 LLM Provider")
+        layout = QFormLayout(group)
+        layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.DontWrapRows)
         layout.setSpacing(4)
         layout.setContentsMargins(8, 10, 8, 8)
 
         # Provider selection
         provider_label = QLabel("Provider:")
-        provider_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.provider_combo = ModernComboBox(200)
+        provider_label.setStyleSheet(self.label_qss)
+        self.provider_combo = modern_combo(200)
         self.provider_combo.addItems(["ollama", "openai", "openrouter", "gemini", "custom"])
-        current_provider = (self.yaml_config.get('provider') if hasattr(self, 'yaml_config') else None) or 'ollama'
+        current_provider = self.yaml_config.get('provider') or 'ollama'
         self.provider_combo.setCurrentText(current_provider)
         self.provider_combo.currentTextChanged.connect(self.on_provider_changed)
-        layout.addWidget(provider_label, 0, 0)
-        layout.addWidget(self.provider_combo, 0, 1)
+        layout.addRow(provider_label, self.provider_combo)
 
-        providers = self.yaml_config.get('providers', {}) if hasattr(self, 'yaml_config') else {}
+        providers = self.yaml_config.get('providers', {})
         cfg = providers.get(current_provider, {})
 
         # Base URL
         base_url_label = QLabel("Base URL:")
-        base_url_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.base_url_input = ModernInput("", 300)
+        base_url_label.setStyleSheet(self.label_qss)
+        self.base_url_input = modern_input(300)
         self.base_url_input.setText(cfg.get('base_url', 'http://localhost:11434/v1'))
         self.base_url_input.textChanged.connect(lambda v: self.on_provider_field_changed('base_url', v))
-        layout.addWidget(base_url_label, 1, 0)
-        layout.addWidget(self.base_url_input, 1, 1)
+        layout.addRow(base_url_label, self.base_url_input)
 
         # API Key
         api_key_label = QLabel("API Key:")
-        api_key_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.api_key_input = ModernInput("", 300)
+        api_key_label.setStyleSheet(self.label_qss)
+        self.api_key_input = modern_input(300)
         self.api_key_input.setText(cfg.get('api_key', ''))
         self.api_key_input.textChanged.connect(lambda v: self.on_provider_field_changed('api_key', v))
-        layout.addWidget(api_key_label, 2, 0)
-        layout.addWidget(self.api_key_input, 2, 1)
+        layout.addRow(api_key_label, self.api_key_input)
 
         # Model
         model_label = QLabel("Model:")
-        model_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.provider_model_input = ModernInput("", 300)
+        model_label.setStyleSheet(self.label_qss)
+        self.provider_model_input = modern_input(300)
         self.provider_model_input.setText(cfg.get('model', ''))
         self.provider_model_input.textChanged.connect(lambda v: self.on_provider_field_changed('model', v))
-        layout.addWidget(model_label, 3, 0)
-        layout.addWidget(self.provider_model_input, 3, 1)
+        layout.addRow(model_label, self.provider_model_input)
 
         # Params (temperature, top_p, max_tokens)
         params = cfg.get('params', {})
         temp_label = QLabel("Temperature:")
-        temp_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.temp_input = ModernInput("", 80)
+        temp_label.setStyleSheet(self.label_qss)
+        self.temp_input = modern_input(80)
         self.temp_input.setText(str(params.get('temperature', 0.7)))
         self.temp_input.textChanged.connect(lambda v: self.on_provider_param_changed('temperature', v))
 
         top_p_label = QLabel("top_p:")
-        top_p_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.top_p_input = ModernInput("", 80)
+        top_p_label.setStyleSheet(self.label_qss)
+        self.top_p_input = modern_input(80)
         self.top_p_input.setText(str(params.get('top_p', 0.9)))
         self.top_p_input.textChanged.connect(lambda v: self.on_provider_param_changed('top_p', v))
 
         max_tokens_label = QLabel("max_tokens:")
-        max_tokens_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.max_tokens_input = ModernInput("", 100)
+        max_tokens_label.setStyleSheet(self.label_qss)
+        self.max_tokens_input = modern_input(100)
         self.max_tokens_input.setText(str(params.get('max_tokens', 2048)))
         self.max_tokens_input.textChanged.connect(lambda v: self.on_provider_param_changed('max_tokens', v))
 
@@ -532,14 +776,14 @@ class MikoSetupGUI(QMainWindow):
         params_row.addWidget(max_tokens_label)
         params_row.addWidget(self.max_tokens_input)
         params_row.addStretch()
-        layout.addLayout(params_row, 4, 0, 1, 2)
+        layout.addRow(params_row)
 
         return group
 
     def on_provider_changed(self, value):
+        # Edits still waiting on the debounce belong to the provider being switched away from
+        self.commit_provider_fields()
         try:
-            if not hasattr(self, 'yaml_config'):
-                self.yaml_config = {}
             self.yaml_config['provider'] = value
             if 'providers' not in self.yaml_config:
                 self.yaml_config['providers'] = {}
@@ -558,71 +802,74 @@ class MikoSetupGUI(QMainWindow):
             print(f"⚠️ Provider change error: {e}")
 
     def on_provider_field_changed(self, key, value):
-        try:
-            provider = self.provider_combo.currentText()
-            if 'providers' not in self.yaml_config:
-                self.yaml_config['providers'] = {}
-            if provider not in self.yaml_config['providers']:
-                self.yaml_config['providers'][provider] = {}
-            self.yaml_config['providers'][provider][key] = value
-        except Exception as e:
-            print(f"⚠️ Provider field update error: {e}")
+        # Fires per keystroke - just remember the latest value and let the timer write it
+        self.pending_provider_fields[(self.provider_combo.currentText(), key, False)] = value
+        self.provider_commit_timer.start()
 
     def on_provider_param_changed(self, key, value):
-        try:
-            provider = self.provider_combo.currentText()
-            if 'providers' not in self.yaml_config:
-                self.yaml_config['providers'] = {}
-            if provider not in self.yaml_config['providers']:
-                self.yaml_config['providers'][provider] = {}
-            if 'params' not in self.yaml_config['providers'][provider]:
-                self.yaml_config['providers'][provider]['params'] = {}
-            # cast numeric if possible
+        self.pending_provider_fields[(self.provider_combo.currentText(), key, True)] = value
+        self.provider_commit_timer.start()
+
+    def commit_provider_fields(self):
+        """Write debounced provider field/param edits into yaml_config"""
+        self.provider_commit_timer.stop()
+        pending, self.pending_provider_fields = self.pending_provider_fields, {}
+        for (provider, key, is_param), value in pending.items():
             try:
-                if key == 'max_tokens':
-                    self.yaml_config['providers'][provider]['params'][key] = int(value)
-                else:
-                    self.yaml_config['providers'][provider]['params'][key] = float(value)
-            except Exception:
-                self.yaml_config['providers'][provider]['params'][key] = value
-        except Exception as e:
-            print(f"⚠️ Provider param update error: {e}")
+                if 'providers' not in self.yaml_config:
+                    self.yaml_config['providers'] = {}
+                if provider not in self.yaml_config['providers']:
+                    self.yaml_config['providers'][provider] = {}
+                if not is_param:
+                    self.yaml_config['providers'][provider][key] = value
+                    continue
+                if 'params' not in self.yaml_config['providers'][provider]:
+                    self.yaml_config['providers'][provider]['params'] = {}
+                # cast numeric if possible
+                try:
+                    if key == 'max_tokens':
+                        self.yaml_config['providers'][provider]['params'][key] = int(value)
+                    else:
+                        self.yaml_config['providers'][provider]['params'][key] = float(value)
+                except Exception:
+                    self.yaml_config['providers'][provider]['params'][key] = value
+            except Exception as e:
+                print(f"⚠️ Provider update error ({key}): {e}")
 
     def create_audio_section(self):
         """Create audio configuration section"""
-        group = ModernGroupBox("🎵 Audio Configuration")
-        layout = QGridLayout(group)
+        group = modern_group("🎵 Audio Configuration")
+        layout = QFormLayout(group)
+        layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.DontWrapRows)
         layout.setSpacing(4)  # Much smaller spacing
         layout.setContentsMargins(8, 10, 8, 8)  # Much smaller margins
         
         # Input device
         input_label = QLabel("🎤 Input Device (Mic/Line):")
-        input_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.input_device_combo = ModernComboBox(300)  # Smaller width
-        input_device_values = ["Default"] + [get_device_display_name(device) for device in self.input_devices]
-        self.input_device_combo.addItems(input_device_values)
-        self.input_device_combo.setCurrentText(self.audio_config.get("input_device_name", "Default"))
+        input_label.setStyleSheet(self.label_qss)
+        self.input_device_combo = modern_combo(300)  # Smaller width
+        # Real device list arrives from AudioEnumThread (see on_devices_ready). A string list
+        # model lets a refresh swap the whole list in one reset instead of clear() + insert
+        self.input_device_model = QStringListModel(["Default", "Loading…"], self)
+        self.input_device_combo.setModel(self.input_device_model)
         
-        layout.addWidget(input_label, 0, 0)
-        layout.addWidget(self.input_device_combo, 0, 1)
+        layout.addRow(input_label, self.input_device_combo)
         
         # Input device info
         self.input_device_info = QLabel("Select input device to see details")
-        self.input_device_info.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
-        layout.addWidget(self.input_device_info, 1, 0, 1, 2)
+        self.input_device_info.setStyleSheet(self.muted_qss)
+        layout.addRow(self.input_device_info)
         
         # Connect input device selection change
         self.input_device_combo.currentTextChanged.connect(self.on_input_device_changed)
         
         # Output device
         output_label = QLabel("🔊 Output Device (Audio):")
-        output_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.output_device_combo = ModernComboBox(300)  # Smaller width
-        output_device_values = ["Default"] + [get_device_display_name(device) for device in self.output_devices]
-        self.output_device_combo.addItems(output_device_values)
-        self.output_device_combo.setCurrentText(self.audio_config.get("output_device_name", "Default"))
-        layout.addWidget(output_label, 1, 0)
-        layout.addWidget(self.output_device_combo, 1, 1)
+        output_label.setStyleSheet(self.label_qss)
+        self.output_device_combo = modern_combo(300)  # Smaller width
+        self.output_device_model = QStringListModel(["Default", "Loading…"], self)
+        self.output_device_combo.setModel(self.output_device_model)
+        layout.addRow(output_label, self.output_device_combo)
         
         return group
     
@@ -632,19 +879,20 @@ class MikoSetupGUI(QMainWindow):
     
     def create_voice_section(self):
         """Create voice configuration section"""
-        group = ModernGroupBox("🎙️ Voice Configuration (TTS)")
-        layout = QGridLayout(group)
+        group = modern_group("🎙️ Voice Configuration (TTS)")
+        layout = QFormLayout(group)
+        layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.DontWrapRows)
         layout.setSpacing(4)  # Much smaller spacing
         layout.setContentsMargins(8, 10, 8, 8)  # Much smaller margins
         
         # Reference audio file
         ref_audio_label = QLabel("🎵 Reference Audio File:")
-        ref_audio_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        # Use default if YAML value is empty
-        ref_audio_default = self.personality["voice_settings"]["ref_audio_path"] or "main_sample.wav"
-        self.ref_audio_input = ModernInput("", 250)  # Smaller width
+        ref_audio_label.setStyleSheet(self.label_qss)
+        # Use default if YAML value is empty or blank
+        ref_audio_default = text_or_default(self.personality["voice_settings"]["ref_audio_path"], DEFAULT_REF_AUDIO)
+        self.ref_audio_input = modern_input(250)  # Smaller width
         self.ref_audio_input.setText(ref_audio_default)  # Set actual text content
-        browse_button = ModernButton("📁 Browse", "#8b5cf6", "#7c3aed")
+        browse_button = modern_button("📁 Browse")
         browse_button.clicked.connect(self.browse_audio_file)
         browse_button.setFixedWidth(80)  # Smaller button
         
@@ -653,40 +901,38 @@ class MikoSetupGUI(QMainWindow):
         audio_layout.addWidget(browse_button)
         audio_layout.addStretch()
         
-        layout.addWidget(ref_audio_label, 0, 0)
-        layout.addLayout(audio_layout, 0, 1)
+        layout.addRow(ref_audio_label, audio_layout)
         
         # Reference text
         ref_text_label = QLabel("📝 Reference Text:")
-        ref_text_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.ref_text_input = ModernTextEdit(60, 300)  # Smaller height and width
-        # Use default if YAML value is empty
-        prompt_text_default = self.personality["voice_settings"]["prompt_text"] or "This is a sample voice for you to just get started with because it sounds kind of cute, but just make sure this doesn't have long silences."
+        ref_text_label.setStyleSheet(self.label_qss)
+        self.ref_text_input = modern_text_edit(60, 300)  # Smaller height and width
+        # Use default if YAML value is empty or blank
+        prompt_text_default = text_or_default(self.personality["voice_settings"]["prompt_text"], DEFAULT_REF_TEXT)
         self.ref_text_input.setPlainText(prompt_text_default)
-        layout.addWidget(ref_text_label, 1, 0)
-        layout.addWidget(self.ref_text_input, 1, 1)
+        layout.addRow(ref_text_label, self.ref_text_input)
         
         # Audio tools
         tools_label = QLabel("🎛️ Reference Audio Tools:")
-        tools_label.setStyleSheet(f"color: {self.colors['accent']}; font-weight: bold; font-size: 10px;")
-        layout.addWidget(tools_label, 2, 0, 1, 2)
+        tools_label.setStyleSheet(self.subheader_qss)
+        layout.addRow(tools_label)
         
         tools_layout = QHBoxLayout()
-        play_button = ModernButton("▶️ Play", "#10b981", "#059669")  # Shorter text
+        play_button = modern_button("▶️ Play")  # Shorter text
         play_button.clicked.connect(self.play_reference_audio)
-        transcribe_button = ModernButton("📝 Transcribe", "#f59e0b", "#d97706")  # Shorter text
+        transcribe_button = modern_button("📝 Transcribe")  # Shorter text
         transcribe_button.clicked.connect(self.transcribe_reference_audio)
         
         tools_layout.addWidget(play_button)
         tools_layout.addWidget(transcribe_button)
         tools_layout.addStretch()
         
-        layout.addLayout(tools_layout, 3, 0, 1, 2)
+        layout.addRow(tools_layout)
         
         # Status label
         self.audio_status = QLabel("Select reference audio file to enable tools")
-        self.audio_status.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
-        layout.addWidget(self.audio_status, 4, 0, 1, 2)
+        self.audio_status.setStyleSheet(self.muted_qss)
+        layout.addRow(self.audio_status)
         
         # Store button references for enabling/disabling
         self.play_button = play_button
@@ -694,8 +940,8 @@ class MikoSetupGUI(QMainWindow):
         
         # Language settings
         lang_label = QLabel("🌐 Text Language:")
-        lang_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.lang_combo = ModernComboBox(80)  # Smaller width
+        lang_label.setStyleSheet(self.label_qss)
+        self.lang_combo = modern_combo(80)  # Smaller width
         self.lang_combo.addItems(["en", "zh", "ja", "ko"])
         self.lang_combo.setCurrentText(self.personality["voice_settings"].get("language", "en"))
         
@@ -703,39 +949,28 @@ class MikoSetupGUI(QMainWindow):
         lang_layout.addWidget(self.lang_combo)
         lang_layout.addStretch()
         
-        layout.addWidget(lang_label, 5, 0)
-        layout.addLayout(lang_layout, 5, 1)
+        layout.addRow(lang_label, lang_layout)
         
         # Ollama Models section
         ollama_label = QLabel("🤖 Ollama Models:")
-        ollama_label.setStyleSheet(f"color: {self.colors['accent']}; font-weight: bold; font-size: 10px;")
-        layout.addWidget(ollama_label, 6, 0, 1, 2)
+        ollama_label.setStyleSheet(self.subheader_qss)
+        layout.addRow(ollama_label)
         
         # Models dropdown
-        self.ollama_models_combo = ModernComboBox(300)
-        self.ollama_models_combo.setStyleSheet(f"""
-            QComboBox {{
-                background-color: {self.colors['bg_light']};
-                border: 2px solid {self.colors['border']};
-                border-radius: 6px;
-                padding: 8px 12px;
-                color: {self.colors['text_primary']};
-                font-size: 10px;
-                min-height: 16px;
-            }}
-        """)
-        layout.addWidget(self.ollama_models_combo, 7, 0, 1, 2)
+        self.ollama_models_combo = modern_combo(300)
+        self.ollama_models_combo.setObjectName("ollamaModels")  # Styled in apply_dark_theme
+        layout.addRow(self.ollama_models_combo)
         
         # Refresh models button
-        refresh_models_button = ModernButton("🔄 Refresh Models", "#6366f1", "#4f46e5")
-        refresh_models_button.clicked.connect(self.refresh_ollama_models)
+        refresh_models_button = modern_button("🔄 Refresh Models")
+        refresh_models_button.clicked.connect(lambda: self.refresh_ollama_models(force=True))
         refresh_models_button.setFixedWidth(120)
         
         models_button_layout = QHBoxLayout()
         models_button_layout.addWidget(refresh_models_button)
         models_button_layout.addStretch()
         
-        layout.addLayout(models_button_layout, 8, 0, 1, 2)
+        layout.addRow(models_button_layout)
         
         # Store reference
         self.refresh_models_button = refresh_models_button
@@ -754,7 +989,7 @@ class MikoSetupGUI(QMainWindow):
     def load_selected_ollama_model(self):
         """Load the previously selected Ollama model from config"""
         try:
-            if hasattr(self, 'yaml_config') and 'ollama_config' in self.yaml_config:
+            if 'ollama_config' in self.yaml_config:
                 selected_model = self.yaml_config['ollama_config'].get('selected_model')
                 if selected_model:
                     # Find the model in the dropdown and select it
@@ -768,41 +1003,17 @@ class MikoSetupGUI(QMainWindow):
     
     def create_asr_section(self):
         """Create ASR (Speech Recognition) configuration section"""
-        group = ModernGroupBox("🎤 Voice Input (ASR)")
-        layout = QGridLayout(group)
+        group = modern_group("🎤 Voice Input (ASR)")
+        layout = QFormLayout(group)
+        layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.DontWrapRows)
         layout.setSpacing(4)  # Much smaller spacing
         layout.setContentsMargins(8, 10, 8, 8)  # Much smaller margins
         
         # ASR Enable/Disable
         asr_enable_label = QLabel("🎤 Enable Voice Input:")
-        asr_enable_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
+        asr_enable_label.setStyleSheet(self.label_qss)
         
-        self.asr_enable_checkbox = QCheckBox("Use microphone for voice commands")
-        self.asr_enable_checkbox.setStyleSheet(f"""
-            QCheckBox {{
-                color: {self.colors['text_primary']};
-                font-size: 12px;
-                spacing: 8px;
-            }}
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-                border: 2px solid {self.colors['border']};
-                border-radius: 4px;
-                background-color: {self.colors['bg_light']};
-            }}
-            QCheckBox::indicator:checked {{
-                background-color: {self.colors['success']};
-                border-color: {self.colors['success']};
-            }}
-            QCheckBox::indicator:unchecked {{
-                background-color: {self.colors['bg_light']};
-                border-color: {self.colors['border']};
-            }}
-            QCheckBox::indicator:hover {{
-                border-color: {self.colors['accent']};
-            }}
-        """)
+        self.asr_enable_checkbox = QCheckBox("Use microphone for voice commands")  # Styled in apply_dark_theme
         self.asr_enable_checkbox.setChecked(self.audio_config.get("asr_enabled", True))  # Default to True
         self.asr_enable_checkbox.setEnabled(True)  # Force enable the checkbox
         self.asr_enable_checkbox.stateChanged.connect(self.on_asr_enabled_changed)
@@ -810,97 +1021,86 @@ class MikoSetupGUI(QMainWindow):
         # Debug: Print checkbox state
         print(f"🔍 ASR Checkbox created: enabled={self.asr_enable_checkbox.isEnabled()}, checked={self.asr_enable_checkbox.isChecked()}")
         
-        layout.addWidget(asr_enable_label, 0, 0)
-        layout.addWidget(self.asr_enable_checkbox, 0, 1)
+        layout.addRow(asr_enable_label, self.asr_enable_checkbox)
         
         # Push-to-Talk Hotkey
         hotkey_label = QLabel("⌨️ Push-to-Talk Hotkey:")
-        hotkey_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.hotkey_combo = ModernComboBox(120)
+        hotkey_label.setStyleSheet(self.label_qss)
+        self.hotkey_combo = modern_combo(120)
         self.hotkey_combo.addItems(["shift", "ctrl", "alt", "space", "f1", "f2", "f3", "f4", "f5"])
         self.hotkey_combo.setCurrentText(self.audio_config.get("push_to_talk_key", "shift"))
         self.hotkey_combo.currentTextChanged.connect(self.on_asr_setting_changed)
-        layout.addWidget(hotkey_label, 1, 0)
-        layout.addWidget(self.hotkey_combo, 1, 1)
+        layout.addRow(hotkey_label, self.hotkey_combo)
         
         # ASR Model
         model_label = QLabel("🧠 ASR Model:")
-        model_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.asr_model_combo = ModernComboBox(120)
-        self.asr_model_combo.addItems(["base.en", "small.en", "medium.en", "large-v3"])
-        self.asr_model_combo.setCurrentText(self.audio_config.get("asr_model", "base.en"))
+        model_label.setStyleSheet(self.label_qss)
+        self.asr_model_combo = modern_combo(120)
+        self.asr_model_combo.addItems(["auto", "tiny.en", "base.en", "small.en", "medium.en", "large-v3"])
+        self.asr_model_combo.setCurrentText(self.audio_config.get("asr_model") or "auto")
         self.asr_model_combo.currentTextChanged.connect(self.on_asr_setting_changed)
-        layout.addWidget(model_label, 2, 0)
-        layout.addWidget(self.asr_model_combo, 2, 1)
+        layout.addRow(model_label, self.asr_model_combo)
         
         # ASR Device
         device_label = QLabel("💻 Processing Device:")
-        device_label.setStyleSheet(f"color: {self.colors['text_primary']}; font-weight: bold; font-size: 12px;")
-        self.asr_device_combo = ModernComboBox(120)
+        device_label.setStyleSheet(self.label_qss)
+        self.asr_device_combo = modern_combo(120)
         self.asr_device_combo.addItems(["cpu", "cuda", "mps"])
         # Default to CPU for Windows compatibility
         default_device = "cpu"  # Windows doesn't support mps
         self.asr_device_combo.setCurrentText(self.audio_config.get("asr_device", default_device))
         self.asr_device_combo.currentTextChanged.connect(self.on_asr_setting_changed)
-        layout.addWidget(device_label, 3, 0)
-        layout.addWidget(self.asr_device_combo, 3, 1)
+        layout.addRow(device_label, self.asr_device_combo)
         
 
         
         # ASR Status
         self.asr_status = QLabel("Voice input disabled. Enable to speak to the AI instead of typing.")
-        self.asr_status.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
-        layout.addWidget(self.asr_status, 5, 0, 1, 2)
+        self.asr_status.setStyleSheet(self.muted_qss)
+        layout.addRow(self.asr_status)
         
         # Initialize ASR status based on current config
         if self.audio_config.get("asr_enabled", False):
             self.asr_status.setText("Voice input enabled. You can now speak to the AI instead of typing.")
-            self.asr_status.setStyleSheet(f"color: {self.colors['success']}; font-size: 10px; margin-top: 5px;")
+            self.asr_status.setStyleSheet(self.success_qss)
         
         return group
     
     def create_status_section(self):
         """Create status section"""
-        group = ModernGroupBox("📊 System Status")
+        group = modern_group("📊 System Status")
         layout = QVBoxLayout(group)
         layout.setContentsMargins(8, 10, 8, 8)  # Much smaller margins
         
         self.status_text = QTextEdit()
         self.status_text.setReadOnly(True)
+        # Log mode: keep the last 200 lines and no undo history, so appends stay cheap
+        self.status_text.document().setMaximumBlockCount(200)
+        self.status_text.setUndoRedoEnabled(False)
         self.status_text.setMinimumHeight(150)  # Reduced height
-        self.status_text.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: {self.colors['bg_light']};
-                border: 2px solid {self.colors['border']};
-                border-radius: 8px;
-                padding: 12px;
-                color: {self.colors['text_primary']};
-                font-size: 11px;
-                font-family: 'Consolas', monospace;
-            }}
-        """)
+        self.status_text.setObjectName("statusLog")  # Styled in apply_dark_theme
         
         layout.addWidget(self.status_text)
         return group
     
     def create_buttons_section(self):
         """Create buttons section"""
-        group = ModernGroupBox("")
+        group = modern_group("")
         group.setTitle("")  # Remove title for buttons section
         layout = QHBoxLayout(group)
         layout.setSpacing(6)  # Much smaller spacing
         layout.setContentsMargins(8, 8, 8, 8)  # Much smaller margins
         
-        refresh_button = ModernButton("🔄 Refresh", "#6366f1", "#4f46e5")  # Shorter text
+        refresh_button = modern_button("🔄 Refresh")  # Shorter text
         refresh_button.clicked.connect(self.refresh_devices)
         
-        deps_button = ModernButton("🔍 Check", "#8b5cf6", "#7c3aed")  # Shorter text
+        deps_button = modern_button("🔍 Check")  # Shorter text
         deps_button.clicked.connect(self.check_dependencies)
         
-        save_button = ModernButton("💾 Save", "#10b981", "#059669")  # Shorter text
+        save_button = modern_button("💾 Save")  # Shorter text
         save_button.clicked.connect(self.save_settings)
         
-        start_button = ModernButton("🚀 Start", "#f59e0b", "#d97706")  # Shorter text
+        start_button = modern_button("🚀 Start")  # Shorter text
         start_button.clicked.connect(self.start_miko)
         
         layout.addWidget(refresh_button)
@@ -939,26 +1139,59 @@ class MikoSetupGUI(QMainWindow):
             QScrollBar::handle:vertical:hover {{
                 background-color: #263146;
             }}
-        """)
+            
+            /* One-off widgets - kept here so Qt parses the rules once for the whole window */
+            QComboBox#ollamaModels {{
+                background-color: {self.colors['bg_light']};
+                border: 2px solid {self.colors['border']};
+                border-radius: 6px;
+                padding: 8px 12px;
+                color: {self.colors['text_primary']};
+                font-size: 10px;
+                min-height: 16px;
+            }}
+            QCheckBox {{
+                color: {self.colors['text_primary']};
+                font-size: 12px;
+                spacing: 8px;
+            }}
+            QCheckBox::indicator {{
+                width: 18px;
+                height: 18px;
+                border: 2px solid {self.colors['border']};
+                border-radius: 4px;
+                background-color: {self.colors['bg_light']};
+            }}
+            QCheckBox::indicator:checked {{
+                background-color: {self.colors['success']};
+                border-color: {self.colors['success']};
+            }}
+            QCheckBox::indicator:unchecked {{
+                background-color: {self.colors['bg_light']};
+                border-color: {self.colors['border']};
+            }}
+            QCheckBox::indicator:hover {{
+                border-color: {self.colors['accent']};
+            }}
+            QTextEdit#statusLog {{
+                background-color: {self.colors['bg_light']};
+                border: 2px solid {self.colors['border']};
+                border-radius: 8px;
+                padding: 12px;
+                color: {self.colors['text_primary']};
+                font-size: 11px;
+                font-family: 'Consolas', monospace;
+            }}
+        """ + MODERN_QSS)
 
-    def add_shadow(self, widget: QWidget, radius: int = 24):
-        try:
-            effect = QGraphicsDropShadowEffect(self)
-            effect.setBlurRadius(radius)
-            effect.setXOffset(0)
-            effect.setYOffset(0)
-            effect.setColor(QColor(0, 0, 0, 110))
-            widget.setGraphicsEffect(effect)
-        except Exception as e:
-            print(f"⚠️ Shadow effect error: {e}")
-    
     def load_yaml_config(self):
         """Load configuration from YAML file"""
         try:
-            if self.config_file.exists():
-                import yaml
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self.yaml_config = yaml.safe_load(f)
+            # Served from the JSON sidecar while the YAML's mtime/size are unchanged (CSafeLoader parse otherwise)
+            data = load_yaml_cached(str(self.config_file))
+            if data is not None:
+                # The cache hands out a shared dict and the GUI edits this one in place
+                self.yaml_config = copy.deepcopy(data) if data else {}
                 print(f"✅ Loaded YAML config: {self.config_file}")
             else:
                 self.yaml_config = {}
@@ -975,7 +1208,7 @@ class MikoSetupGUI(QMainWindow):
             self.personality = self.get_default_personality()
             
             # Try loading from YAML first, but only update non-empty values
-            if hasattr(self, 'yaml_config') and 'personality' in self.yaml_config:
+            if 'personality' in self.yaml_config:
                 yaml_personality = self.yaml_config['personality']
                 for key, value in yaml_personality.items():
                     if value and value != '':  # Only use non-empty values
@@ -988,8 +1221,8 @@ class MikoSetupGUI(QMainWindow):
                             self.personality[key] = value
                 print("✅ Loaded personality from YAML with defaults")
             elif self.personality_file.exists():
-                with open(self.personality_file, 'r') as f:
-                    json_personality = json.load(f)
+                with open(self.personality_file, 'rb') as f:
+                    json_personality = _json_loads(f.read())
                     for key, value in json_personality.items():
                         if value and value != '':
                             self.personality[key] = value
@@ -1004,12 +1237,12 @@ class MikoSetupGUI(QMainWindow):
         """Load audio configuration from YAML or fallback to JSON"""
         try:
             # Try to load from YAML first
-            if hasattr(self, 'yaml_config') and 'audio_devices' in self.yaml_config:
+            if 'audio_devices' in self.yaml_config:
                 self.audio_config = self.yaml_config['audio_devices']
                 print("✅ Loaded audio config from YAML")
             elif self.audio_config_file.exists():
-                with open(self.audio_config_file, 'r') as f:
-                    self.audio_config = json.load(f)
+                with open(self.audio_config_file, 'rb') as f:
+                    self.audio_config = _json_loads(f.read())
                 print("✅ Loaded audio config from JSON file")
             else:
                 self.audio_config = {
@@ -1018,7 +1251,7 @@ class MikoSetupGUI(QMainWindow):
                     "device_index": None,
                     "asr_enabled": False,
                     "push_to_talk_key": "shift",
-                    "asr_model": "base.en",
+                    "asr_model": "auto",
                     "asr_device": "cpu"  # Windows compatible default
                 }
                 print("✅ Using default audio config")
@@ -1030,20 +1263,20 @@ class MikoSetupGUI(QMainWindow):
                 "device_index": None,
                 "asr_enabled": False,
                 "push_to_talk_key": "shift",
-                "asr_model": "base.en",
+                "asr_model": "auto",
                 "asr_device": "cpu"  # Windows compatible default
             }
     
     def get_default_personality(self):
         """Default personality fallback"""
         return {
-            "name": "Miko",
+            "name": DEFAULT_NAME,
             "system_prompt": "You are Miko, an AI kitsune girl with a smug and teasing personality!",
-            "greeting": "Oh, look who's here! I'm Miko!",
-            "farewell": "Hmph, leaving already?",
+            "greeting": DEFAULT_GREETING,
+            "farewell": DEFAULT_FAREWELL,
             "error_message": "Ugh, my circuits are acting up!",
             "voice_settings": {
-                "ref_audio_path": "main_sample.wav",
+                "ref_audio_path": DEFAULT_REF_AUDIO,
                 "prompt_text": "Sample voice for Miko",
                 "language": "en"
             }
@@ -1052,6 +1285,8 @@ class MikoSetupGUI(QMainWindow):
     def load_audio_devices(self):
         """Load available audio input and output devices"""
         try:
+            # Devices may have been plugged/unplugged since the last lookup
+            clear_device_cache()
             self.input_devices, self.output_devices = get_audio_devices()
             self.default_input, self.default_output = get_default_devices()
         except Exception as e:
@@ -1061,51 +1296,119 @@ class MikoSetupGUI(QMainWindow):
             self.default_input = None
             self.default_output = None
     
+    def status_html(self, message, message_type="info"):
+        """Format one status log line"""
+        return self.log_span_open.get(message_type, self.log_span_default) + message + '</span>'
+    
     def log_status(self, message, message_type="info"):
         """Add message to status log with styling"""
-        color_map = {
-            "success": self.colors['success'],
-            "error": self.colors['error'],
-            "warning": self.colors['warning'],
-            "info": self.colors['accent']
-        }
-        
-        color = color_map.get(message_type, self.colors['text_primary'])
-        html_message = f'<span style="color: {color};">{message}</span><br>'
+        self.log_status_batch([(message, message_type)])
+    
+    def log_status_batch(self, updates):
+        """Add several (message, type) lines to the status log in one edit"""
+        document = self.status_text.document()
+        # Repaint once after the lines are in and the view has scrolled, not per step
+        self.status_text.setUpdatesEnabled(False)
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        for message, message_type in updates:
+            # One block per line so setMaximumBlockCount can drop the oldest ones
+            if not document.isEmpty():
+                cursor.insertBlock()
+            cursor.insertHtml(self.status_html(message, message_type))
+        cursor.endEditBlock()
         
         self.status_text.moveCursor(QTextCursor.MoveOperation.End)
-        self.status_text.insertHtml(html_message)
         self.status_text.ensureCursorVisible()
+        self.status_text.setUpdatesEnabled(True)
     
     def check_dependencies(self):
         """Check dependencies in a separate thread"""
         self.status_text.clear()
         self.status_thread = StatusThread()
-        self.status_thread.status_update.connect(self.log_status)
+        self.status_thread.status_batch.connect(self.log_status_batch)
+        # Probe TTS after the other checks so its line lands under "Checking services"
+        self.status_thread.finished.connect(self.check_tts_server)
         self.status_thread.start()
     
+    def check_tts_server(self):
+        """Probe the TTS server asynchronously - the reply is handled in on_tts_probe_finished"""
+        if time.time() - load_dep_cache().get('tts_ok_at', 0) < SERVICE_OK_TTL:
+            self.log_status("✅ TTS server running (port 9880)", "success")
+            return
+        if self.network_manager is None:
+            self.network_manager = QNetworkAccessManager(self)
+        request = QNetworkRequest(QUrl("http://127.0.0.1:9880"))
+        request.setTransferTimeout(2000)
+        reply = self.network_manager.get(request)
+        reply.finished.connect(lambda: self.on_tts_probe_finished(reply))
+    
+    def on_tts_probe_finished(self, reply):
+        """Any HTTP response (even a 404) means the server is up"""
+        status_code = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        cache = load_dep_cache()
+        if status_code is not None:
+            cache['tts_ok_at'] = time.time()
+            self.log_status("✅ TTS server running (port 9880)", "success")
+        else:
+            cache.pop('tts_ok_at', None)
+            self.log_status("❌ TTS server not running (port 9880)", "error")
+            self.log_status("   Start your TTS server first", "warning")
+        save_dep_cache(cache)
+        reply.deleteLater()
+    
+    def on_devices_ready(self, input_devices, output_devices):
+        """Populate the device dropdowns once AudioEnumThread has finished"""
+        self.input_devices = input_devices
+        self.output_devices = output_devices
+        self.default_input, self.default_output = get_default_devices()
+        
+        # Restore the saved selections now that the names exist in the list. The model reset and
+        # selection each emit currentTextChanged - block them and update the info label once
+        with QSignalBlocker(self.input_device_combo), QSignalBlocker(self.output_device_combo):
+            self.fill_device_combos(
+                self.audio_config.get("input_device_name", "Default"),
+                self.audio_config.get("output_device_name", "Default")
+            )
+        self.on_input_device_changed(self.input_device_combo.currentText())
+    
+    def fill_device_combos(self, input_name, output_name):
+        """Rebuild both device dropdowns, selecting the given names (Default if no longer present)"""
+        # Name lookups for the selection handlers - first device wins if two share a name, like the old scan
+        self._input_name_to_device = {}
+        for device in self.input_devices:
+            self._input_name_to_device.setdefault(get_device_display_name(device), device)
+        self._output_name_to_device = {}
+        for device in self.output_devices:
+            self._output_name_to_device.setdefault(get_device_display_name(device), device)
+        
+        # One repaint for the model reset + selection instead of one each
+        self.input_device_combo.setUpdatesEnabled(False)
+        self.output_device_combo.setUpdatesEnabled(False)
+        
+        # Update input device dropdown
+        input_device_values = ["Default"] + list(self._input_name_to_device)
+        self.input_device_model.setStringList(input_device_values)
+        self.input_device_combo.setCurrentText(input_name if input_name in input_device_values else "Default")
+        
+        # Update output device dropdown
+        output_device_values = ["Default"] + list(self._output_name_to_device)
+        self.output_device_model.setStringList(output_device_values)
+        self.output_device_combo.setCurrentText(output_name if output_name in output_device_values else "Default")
+        
+        self.input_device_combo.setUpdatesEnabled(True)
+        self.output_device_combo.setUpdatesEnabled(True)
+    
     def refresh_devices(self):
         """Refresh the available audio devices"""
         self.load_audio_devices()
         
-        # Update input device dropdown
-        input_device_values = ["Default"] + [get_device_display_name(device) for device in self.input_devices]
-        self.input_device_combo.clear()
-        self.input_device_combo.addItems(input_device_values)
-        
-        # Update output device dropdown  
-        output_device_values = ["Default"] + [get_device_display_name(device) for device in self.output_devices]
-        self.output_device_combo.clear()
-        self.output_device_combo.addItems(output_device_values)
-        
-        # Reset selections to Default if current selection is no longer valid
-        current_input = self.input_device_combo.currentText()
-        if current_input not in input_device_values:
-            self.input_device_combo.setCurrentText("Default")
-            
-        current_output = self.output_device_combo.currentText()
-        if current_output not in output_device_values:
-            self.output_device_combo.setCurrentText("Default")
+        # Keep the current selections if those devices are still around. Same as on_devices_ready:
+        # no currentTextChanged while the lists are swapped, one info label update afterwards
+        with QSignalBlocker(self.input_device_combo), QSignalBlocker(self.output_device_combo):
+            self.fill_device_combos(self.input_device_combo.currentText(), self.output_device_combo.currentText())
+        self.on_input_device_changed(self.input_device_combo.currentText())
         
         QMessageBox.information(self, "Devices Refreshed", "Audio device list has been updated!")
         self.log_status("🔄 Audio devices refreshed", "success")
@@ -1122,7 +1425,7 @@ class MikoSetupGUI(QMainWindow):
             self.ref_audio_input.setText(file_path)
             self.current_audio_file = file_path
             self.audio_status.setText(f"Audio file selected: {Path(file_path).name}")
-            self.audio_status.setStyleSheet(f"color: {self.colors['success']}; font-size: 12px; margin-top: 10px;")
+            self.set_style(self.audio_status, self.notice_qss['success'])
             self.log_status(f"📁 Selected audio: {Path(file_path).name}", "success")
             
             # Enable the audio tools buttons
@@ -1131,18 +1434,25 @@ class MikoSetupGUI(QMainWindow):
     def enable_audio_tools(self):
         """Enable or disable audio tools based on file selection"""
         audio_file = self.ref_audio_input.text()
-        if audio_file and os.path.exists(audio_file):
+        # isfile also rejects a directory, which the tools can't open anyway
+        is_ready = bool(audio_file) and os.path.isfile(audio_file)
+        # Same file and same answer as last time - the buttons and label are already right
+        if (audio_file, is_ready) == self._audio_tools_state:
+            return
+        self._audio_tools_state = (audio_file, is_ready)
+        
+        if is_ready:
             # Enable buttons
             self.play_button.setEnabled(True)
             self.transcribe_button.setEnabled(True)
-            self.audio_status.setText(f"Audio file ready: {Path(audio_file).name}")
-            self.audio_status.setStyleSheet(f"color: {self.colors['success']}; font-size: 10px; margin-top: 5px;")
+            self.audio_status.setText(f"Audio file ready: {os.path.basename(audio_file)}")
+            self.set_style(self.audio_status, self.success_qss)
         else:
             # Disable buttons
             self.play_button.setEnabled(False)
             self.transcribe_button.setEnabled(False)
             self.audio_status.setText("Select reference audio file to enable tools")
-            self.audio_status.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
+            self.set_style(self.audio_status, self.muted_qss)
     
     def play_reference_audio(self):
         """Play the selected reference audio file"""
@@ -1151,28 +1461,30 @@ class MikoSetupGUI(QMainWindow):
             QMessageBox.critical(self, "Error", "Please select a valid reference audio file first!")
             return
             
-        try:
-            # Load and play the audio file
-            audio_data, sample_rate = sf.read(audio_file)
-            
-            # Get selected output device
-            output_device_name = self.output_device_combo.currentText()
-            output_device_id = None
-            
-            if output_device_name != "Default":
-                for device in self.output_devices:
-                    if device['name'] == output_device_name:
-                        output_device_id = device['id']
-                        break
-            
-            sd.play(audio_data, samplerate=sample_rate, device=output_device_id)
-            self.audio_status.setText("Playing reference audio...")
-            self.audio_status.setStyleSheet(f"color: {self.colors['accent']}; font-size: 12px; margin-top: 10px;")
-            self.log_status(f"🔊 Playing audio on: {output_device_name}", "info")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Playback Error", f"Failed to play audio: {str(e)}")
-            self.log_status(f"❌ Playback error: {e}", "error")
+        # Get selected output device
+        output_device_name = self.output_device_combo.currentText()
+        output_device_id = None
+        
+        if output_device_name != "Default":
+            device = self._output_name_to_device.get(output_device_name)
+            if device is not None:
+                output_device_id = device['id']
+        
+        # Pressing Play again restarts the clip instead of mixing two streams
+        if self.playback_thread is not None and self.playback_thread.isRunning():
+            self.playback_thread.stop()
+            self.playback_thread.wait()
+        
+        self.playback_thread = PlaybackThread(audio_file, output_device_id)
+        self.playback_thread.failed.connect(self.on_playback_failed)
+        self.playback_thread.start()
+        self.audio_status.setText("Playing reference audio...")
+        self.set_style(self.audio_status, self.notice_qss['accent'])
+        self.log_status(f"🔊 Playing audio on: {output_device_name}", "info")
+    
+    def on_playback_failed(self, error):
+        QMessageBox.critical(self, "Playback Error", f"Failed to play audio: {error}")
+        self.log_status(f"❌ Playback error: {error}", "error")
     
     def transcribe_reference_audio(self):
         """Transcribe the reference audio file using faster-whisper"""
@@ -1181,31 +1493,43 @@ class MikoSetupGUI(QMainWindow):
             QMessageBox.critical(self, "Error", "Please select a valid reference audio file first!")
             return
             
-        try:
-            self.audio_status.setText("Transcribing reference audio...")
-            self.audio_status.setStyleSheet(f"color: {self.colors['accent']}; font-size: 12px; margin-top: 10px;")
-            self.log_status("🎯 Starting transcription...", "info")
-            
-            # Load Whisper model and transcribe
-            from faster_whisper import WhisperModel
-            model = WhisperModel("base.en", device="cpu", compute_type="float32")
-            
-            segments, _ = model.transcribe(audio_file)
-            transcription = " ".join([segment.text for segment in segments])
-            
-            # Update the reference text field
-            self.ref_text_input.setPlainText(transcription.strip())
-            
-            self.audio_status.setText(f"Transcribed: {transcription[:50]}...")
-            self.audio_status.setStyleSheet(f"color: {self.colors['success']}; font-size: 12px; margin-top: 10px;")
-            self.log_status(f"✅ Transcription complete: {transcription[:50]}...", "success")
-            QMessageBox.information(self, "Transcription Complete", f"Reference audio transcribed successfully!\n\nText: {transcription}")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Transcription Error", f"Failed to transcribe: {str(e)}")
-            self.audio_status.setText("Transcription failed")
-            self.audio_status.setStyleSheet(f"color: {self.colors['error']}; font-size: 12px; margin-top: 10px;")
-            self.log_status(f"❌ Transcription error: {e}", "error")
+        self.audio_status.setText("Transcribing reference audio...")
+        self.set_style(self.audio_status, self.notice_qss['accent'])
+        self.log_status("🎯 Starting transcription...", "info")
+        
+        # Same model/device as the ASR settings. "auto" (or unset) picks what ASRManager starts on:
+        # tiny.en on CPU, base.en otherwise (AUTO_START_MODEL / AUTO_UPGRADE_MODEL in modules/asr.py)
+        device = self.audio_config.get("asr_device") or "cpu"
+        model_name = self.audio_config.get("asr_model")
+        if model_name in (None, "", "auto"):
+            model_name = "tiny.en" if device == "cpu" else "base.en"
+        
+        # Model load + decode take seconds - run them off the UI thread, one at a time
+        self.transcribe_button.setEnabled(False)
+        self.transcribe_thread = TranscribeThread(audio_file, model_name, device, self._whisper_models)
+        self.transcribe_thread.progress.connect(lambda text: self.log_status(f"📝 {text}", "info"))
+        self.transcribe_thread.done.connect(self.on_transcription_done)
+        self.transcribe_thread.failed.connect(self.on_transcription_failed)
+        self.transcribe_thread.start()
+    
+    def on_transcription_done(self, transcription):
+        """Put the finished transcription into the reference text field"""
+        self.transcribe_button.setEnabled(True)
+        
+        # Update the reference text field
+        self.ref_text_input.setPlainText(transcription.strip())
+        
+        self.audio_status.setText(f"Transcribed: {transcription[:50]}...")
+        self.set_style(self.audio_status, self.notice_qss['success'])
+        self.log_status(f"✅ Transcription complete: {transcription[:50]}...", "success")
+        QMessageBox.information(self, "Transcription Complete", f"Reference audio transcribed successfully!\n\nText: {transcription}")
+    
+    def on_transcription_failed(self, error):
+        self.transcribe_button.setEnabled(True)
+        QMessageBox.critical(self, "Transcription Error", f"Failed to transcribe: {error}")
+        self.audio_status.setText("Transcription failed")
+        self.set_style(self.audio_status, self.notice_qss['error'])
+        self.log_status(f"❌ Transcription error: {error}", "error")
     
     
 
@@ -1214,16 +1538,14 @@ class MikoSetupGUI(QMainWindow):
         """Handle input device selection change"""
         if device_name == "Default":
             self.input_device_info.setText("Using system default input device")
-            self.input_device_info.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
+            self.set_style(self.input_device_info, self.muted_qss)
             return
         
         # Find device details
         device_details = None
-        for device in self.input_devices:
-            if get_device_display_name(device) == device_name:
-                from modules.audio_utils import get_device_details
-                device_details = get_device_details(device)
-                break
+        device = self._input_name_to_device.get(device_name)
+        if device is not None:
+            device_details = get_device_details(device)
         
         if device_details:
             # Show device information
@@ -1243,10 +1565,10 @@ class MikoSetupGUI(QMainWindow):
                 info_text += " | 🔌 Auxiliary input connection"
             
             self.input_device_info.setText(info_text)
-            self.input_device_info.setStyleSheet(f"color: {self.colors['success']}; font-size: 10px; margin-top: 5px;")
+            self.set_style(self.input_device_info, self.success_qss)
         else:
             self.input_device_info.setText("Device information not available")
-            self.input_device_info.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
+            self.set_style(self.input_device_info, self.muted_qss)
     
     def initialize_asr_state(self):
         """Initialize ASR checkbox and button state"""
@@ -1254,44 +1576,41 @@ class MikoSetupGUI(QMainWindow):
             is_enabled = self.asr_enable_checkbox.isChecked()
             if is_enabled:
                 self.asr_status.setText("Voice input enabled. You can now speak to the AI instead of typing.")
-                self.asr_status.setStyleSheet(f"color: {self.colors['success']}; font-size: 10px; margin-top: 5px;")
+                self.set_style(self.asr_status, self.success_qss)
             else:
                 self.asr_status.setText("Voice input disabled. Enable to use microphone commands.")
-                self.asr_status.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
+                self.set_style(self.asr_status, self.muted_qss)
     
     def on_asr_enabled_changed(self, state):
         """Handle ASR enable/disable checkbox state change"""
-        print(f"🔍 ASR Checkbox state changed: {state} (Checked={state == Qt.CheckState.Checked})")
-        
-        # Update the local audio config immediately
-        self.audio_config["asr_enabled"] = (state == Qt.CheckState.Checked)
-        
-        # Update the YAML config immediately
-        if hasattr(self, 'yaml_config'):
+        # stateChanged delivers a plain int - wrap it so the enum comparison can actually match
+        is_checked = Qt.CheckState(state) == Qt.CheckState.Checked
+        print(f"🔍 ASR Checkbox state changed: {state} (Checked={is_checked})")
+        
+        # Only touch the config (and schedule a write) when the value really changed
+        if bool(self.audio_config.get("asr_enabled")) != is_checked:
+            # Update the local audio config immediately
+            self.audio_config["asr_enabled"] = is_checked
+            
+            # Update the YAML config immediately
             if 'audio_devices' not in self.yaml_config:
                 self.yaml_config['audio_devices'] = {}
-            self.yaml_config['audio_devices']['asr_enabled'] = (state == Qt.CheckState.Checked)
-            
-            # Save to YAML file immediately
-            try:
-                import yaml
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    yaml.dump(self.yaml_config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                print(f"✅ YAML config updated immediately: asr_enabled = {state == Qt.CheckState.Checked}")
-            except Exception as e:
-                print(f"❌ Failed to update YAML immediately: {e}")
+            self.yaml_config['audio_devices']['asr_enabled'] = is_checked
+                
+            # Written to disk once the user stops clicking (see flush_yaml_config)
+            self.yaml_save_timer.start()
         
-        if state == Qt.CheckState.Checked:
+        if is_checked:
             self.asr_status.setText("Voice input enabled. You can now speak to the AI instead of typing.")
-            self.asr_status.setStyleSheet(f"color: {self.colors['success']}; font-size: 10px; margin-top: 5px;")
+            self.set_style(self.asr_status, self.success_qss)
             print("✅ ASR enabled")
         else:
             self.asr_status.setText("Voice input disabled. Enable to use microphone commands.")
-            self.asr_status.setStyleSheet(f"color: {self.colors['text_muted']}; font-size: 10px; margin-top: 5px;")
+            self.set_style(self.asr_status, self.muted_qss)
             print("❌ ASR disabled")
     
     def on_asr_setting_changed(self, value):
-        """Handle ASR setting changes and update YAML immediately"""
+        """Handle ASR setting changes and schedule a YAML save"""
         try:
             # Determine which setting changed and update accordingly
             sender = self.sender()
@@ -1308,183 +1627,190 @@ class MikoSetupGUI(QMainWindow):
             else:
                 return
             
+            # Same value (e.g. a programmatic setCurrentText) - nothing to write
+            if self.audio_config.get(setting_key) == setting_value:
+                return
+            
             # Update local config
             self.audio_config[setting_key] = setting_value
             
             # Update YAML config immediately
-            if hasattr(self, 'yaml_config'):
-                if 'audio_devices' not in self.yaml_config:
-                    self.yaml_config['audio_devices'] = {}
-                self.yaml_config['audio_devices'][setting_key] = setting_value
+            if 'audio_devices' not in self.yaml_config:
+                self.yaml_config['audio_devices'] = {}
+            self.yaml_config['audio_devices'][setting_key] = setting_value
                 
-                # Save to YAML file immediately
-                import yaml
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    yaml.dump(self.yaml_config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                print(f"✅ YAML config updated immediately: {setting_key} = {setting_value}")
+            # Written to disk once the user stops changing settings (see flush_yaml_config)
+            self.yaml_save_timer.start()
                 
         except Exception as e:
             print(f"❌ Failed to update YAML for ASR setting: {e}")
     
-    def refresh_ollama_models(self):
-        """Refresh the list of available Ollama models"""
+    def flush_yaml_config(self):
+        """Write pending YAML config changes to disk on the writer thread"""
+        self.yaml_save_timer.stop()
+        # Snapshot so later edits on the UI thread can't change the dict mid-dump
+        self.yaml_write_pool.start(YamlWriteTask(self.config_file, copy.deepcopy(self.yaml_config)))
+    
+    def closeEvent(self, event):
+        # Don't lose a setting changed within the last debounce interval
+        if self.yaml_save_timer.isActive():
+            self.flush_yaml_config()
+        self.yaml_write_pool.waitForDone()
+        if self.playback_thread is not None and self.playback_thread.isRunning():
+            self.playback_thread.stop()
+            self.playback_thread.wait()
+        if self._ollama_worker is not None:
+            self._ollama_worker.wait()
+        # Tearing down a QThread mid-decode aborts the process - let the transcription finish
+        if self.transcribe_thread is not None and self.transcribe_thread.isRunning():
+            self.transcribe_thread.wait()
+        super().closeEvent(event)
+    
+    def refresh_ollama_models(self, force=False):
+        """Refresh the list of available Ollama models.
+        The cached list is shown first; it is refetched once older than a day, or when forced."""
         try:
-            self.log_status("🔄 Fetching Ollama models...", "info")
-            self.ollama_models_combo.clear()
-            self.ollama_models_combo.addItem("Loading models...")
-            
-            # Try to import ollama
-            try:
-                import ollama
-            except ImportError:
-                self.ollama_models_combo.clear()
-                self.ollama_models_combo.addItem("❌ Ollama package not installed")
-                self.log_status("❌ Ollama package not installed", "error")
+            # One fetch at a time - a second press while it's running has nothing to add
+            if self._ollama_worker is not None and self._ollama_worker.isRunning():
                 return
             
-            # Check if Ollama service is running
-            try:
-                # Use proper Ollama API - returns ListResponse object
-                models = ollama.list()
-                
-                # Get the models list from the ListResponse object
-                if hasattr(models, 'models'):
-                    models_list = models.models
-                    self.log_status(f"✅ Found {len(models_list)} Ollama models", "success")
-                else:
-                    self.ollama_models_combo.clear()
-                    self.ollama_models_combo.addItem("⚠️ No models found")
-                    self.log_status("⚠️ No Ollama models found", "warning")
+            cached_models, fresh = load_cached_ollama_models()
+            if cached_models is not None:
+                self.populate_ollama_models(cached_models)
+                if remote_models_disabled() or (fresh and not force):
+                    self.log_status("✅ Using cached Ollama model list", "success")
                     return
-                
-                # Clear and populate dropdown
-                self.ollama_models_combo.clear()
-                self.ollama_models_combo.addItem("Select a model...")
-                
-                # Categorize models by type
-                model_categories = {
-                    'llama': [],
-                    'mistral': [],
-                    'codellama': [],
-                    'phi': [],
-                    'gemma': [],
-                    'qwen': [],
-                    'granite': [],
-                    'starcoder': [],
-                    'nomic': [],
-                    'other': []
-                }
-                
-                # Sort models into categories
-                for model in models_list:
-                    # Model objects have attributes: model, size, modified_at, details
-                    name = model.model  # This is the model name
-                    size = model.size
-                    size_mb = size / (1024 * 1024) if size > 0 else 0
-                    
-                    # Determine category based on model name and family
-                    category = 'other'
-                    if hasattr(model, 'details') and hasattr(model.details, 'family'):
-                        family = model.details.family.lower()
-                        if 'llama' in family:
-                            category = 'llama'
-                        elif 'mistral' in family:
-                            category = 'mistral'
-                        elif 'starcoder' in family:
-                            category = 'starcoder'
-                        elif 'granite' in family:
-                            category = 'granite'
-                        elif 'nomic' in family:
-                            category = 'nomic'
-                        elif 'qwen' in family:
-                            category = 'qwen'
-                        elif 'gemma' in family:
-                            category = 'gemma'
-                        elif 'phi' in family:
-                            category = 'phi'
-                    
-                    # Fallback to name-based categorization if family not available
-                    if category == 'other':
-                        name_lower = name.lower()
-                        if 'llama' in name_lower:
-                            category = 'llama'
-                        elif 'mistral' in name_lower:
-                            category = 'mistral'
-                        elif 'codellama' in name_lower or 'starcoder' in name_lower:
-                            category = 'codellama'
-                        elif 'phi' in name_lower:
-                            category = 'phi'
-                        elif 'gemma' in name_lower:
-                            category = 'gemma'
-                        elif 'qwen' in name_lower:
-                            category = 'qwen'
-                        elif 'granite' in name_lower:
-                            category = 'granite'
-                        elif 'nomic' in name_lower:
-                            category = 'nomic'
-                    
-                    model_categories[category].append({
-                        'name': name,
-                        'size_mb': size_mb,
-                        'size': size
-                    })
-                
-                # Add categorized models to dropdown
-                for category, models_list in model_categories.items():
-                    if models_list:
-                        # Sort by size (largest first)
-                        models_list.sort(key=lambda x: x['size'], reverse=True)
-                        
-                        # Add category separator
-                        if category != list(model_categories.keys())[0]:  # Skip separator for first category
-                            self.ollama_models_combo.addItem("─" * 30)
-                        
-                        # Add models in this category
-                        for model in models_list:
-                            # Format display text with proper categorization
-                            if category == 'llama':
-                                display_text = f"🦙 {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'mistral':
-                                display_text = f"🌪️ {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'codellama':
-                                display_text = f"💻 {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'starcoder':
-                                display_text = f"⭐ {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'granite':
-                                display_text = f"🪨 {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'phi':
-                                display_text = f"φ {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'gemma':
-                                display_text = f"💎 {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'qwen':
-                                display_text = f"🔮 {model['name']} ({model['size_mb']:.1f} MB)"
-                            elif category == 'nomic':
-                                display_text = f"📊 {model['name']} ({model['size_mb']:.1f} MB)"
-                            else:
-                                display_text = f"🤖 {model['name']} ({model['size_mb']:.1f} MB)"
-                            
-                            self.ollama_models_combo.addItem(display_text, userData=model['name'])
-                
-                self.log_status(f"✅ Loaded {len(models_list)} models in {len([c for c in model_categories.values() if c])} categories", "success")
-                
-            except Exception as e:
-                if "Connection refused" in str(e) or "Failed to establish" in str(e):
-                    self.ollama_models_combo.clear()
-                    self.ollama_models_combo.addItem("❌ Ollama service not running")
-                    self.log_status("❌ Ollama service not running", "error")
-                else:
-                    self.ollama_models_combo.clear()
-                    self.ollama_models_combo.addItem(f"❌ Error: {str(e)[:30]}...")
-                    self.log_status(f"❌ Failed to fetch models: {e}", "error")
-                    
+            elif remote_models_disabled():
+                self.set_ollama_placeholder("⚠️ No cached models")
+                self.log_status("⚠️ Remote model list disabled and no cached list", "warning")
+                return
+            else:
+                self.set_ollama_placeholder("Loading models...")
+            
+            self.log_status("🔄 Fetching Ollama models...", "info")
+            self._ollama_cached_shown = cached_models is not None
+            self._ollama_worker = OllamaListWorker()
+            self._ollama_worker.models_ready.connect(self.on_ollama_models_ready)
+            self._ollama_worker.failed.connect(self.on_ollama_list_failed)
+            self._ollama_worker.start()
+            
         except Exception as e:
-            self.ollama_models_combo.clear()
-            self.ollama_models_combo.addItem(f"❌ Unexpected error")
+            self.set_ollama_placeholder(f"❌ Unexpected error")
             self.log_status(f"❌ Unexpected error: {e}", "error")
     
+    def set_ollama_placeholder(self, text):
+        """Replace the models dropdown with a single status row. Signals stay blocked, like in
+        populate_ollama_models - a placeholder is never a selection worth reacting to."""
+        with QSignalBlocker(self.ollama_models_combo):
+            self.ollama_models_combo.clear()
+            self.ollama_models_combo.addItem(text)
+        self._ollama_row_texts = [text]
+    
+    def on_ollama_models_ready(self, models_list, changed):
+        """Show the list OllamaListWorker fetched"""
+        if models_list is None:
+            self.set_ollama_placeholder("⚠️ No models found")
+            self.log_status("⚠️ No Ollama models found", "warning")
+            return
+        
+        self.log_status(f"✅ Found {len(models_list)} Ollama models", "success")
+        # Only repopulate if the list differs from the cached one already shown
+        if changed or not self._ollama_cached_shown:
+            self.populate_ollama_models(models_list)
+    
+    def on_ollama_list_failed(self, kind, message):
+        """Report a failed fetch - a cached list already in the dropdown stays put"""
+        if kind == 'missing':
+            if not self._ollama_cached_shown:
+                self.set_ollama_placeholder("❌ Ollama package not installed")
+            self.log_status("❌ Ollama package not installed", "error")
+        elif kind == 'offline':
+            if self._ollama_cached_shown:
+                # Keep the stale list - better than an empty dropdown
+                self.log_status("⚠️ Ollama service not running - showing cached models", "warning")
+                return
+            self.set_ollama_placeholder("❌ Ollama service not running")
+            self.log_status("❌ Ollama service not running", "error")
+        else:
+            self.set_ollama_placeholder(f"❌ Error: {message[:30]}...")
+            self.log_status(f"❌ Failed to fetch models: {message}", "error")
+    
+    def populate_ollama_models(self, models_list):
+        """Fill the models dropdown from {name, size, family} dicts, keeping the current selection"""
+        # The list may arrive after load_selected_ollama_model ran - fall back to the saved choice
+        selected_model = self.get_selected_ollama_model() or self.yaml_config.get('ollama_config', {}).get('selected_model')
+        
+        # Dropdown rows, built first and inserted in one go below
+        texts = ["Select a model..."]
+        names = [None]
+        
+        # (group rank, -size, ...) rows - one sort puts the groups in order, largest model first in each
+        rows = []
+        for model in models_list:
+            # Determine category based on model family, then name
+            category = ollama_model_category(model['name'], model['family'])
+            rows.append((OLLAMA_CATEGORY_RANK[category], -model['size'], model['name'], category))
+        rows.sort(key=itemgetter(0, 1))
+        
+        # Add categorized models to dropdown
+        previous_category = None
+        category_count = 0
+        for rank, negative_size, name, category in rows:
+            if category != previous_category:
+                previous_category = category
+                category_count += 1
+                # Add category separator
+                if rank > 0:  # Skip separator for first category
+                    texts.append(MODEL_GROUP_SEPARATOR)
+                    names.append(None)
+            
+            size_mb = -negative_size * MB_PER_BYTE
+            # Format display text with proper categorization
+            texts.append(f"{OLLAMA_CATEGORY_EMOJI[category]} {name} ({size_mb:.1f} MB)")
+            names.append(name)
+        
+        # Same rows as already shown - nothing to touch
+        if texts == self._ollama_row_texts:
+            self.log_status(f"✅ Ollama model list unchanged ({len(models_list)} models)", "success")
+            return
+        
+        with QSignalBlocker(self.ollama_models_combo):
+            self.ollama_models_combo.setUpdatesEnabled(False)
+            
+            # Patch only the rows that differ (a model pulled or removed); opcodes are applied
+            # back to front so the earlier indices stay valid
+            opcodes = SequenceMatcher(None, self._ollama_row_texts, texts, autojunk=False).get_opcodes()
+            changed_rows = sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in opcodes if tag != 'equal')
+            if changed_rows <= len(texts) // 4:
+                for tag, i1, i2, j1, j2 in reversed(opcodes):
+                    if tag == 'equal':
+                        continue
+                    for row in range(i2 - 1, i1 - 1, -1):
+                        self.ollama_models_combo.removeItem(row)
+                    for offset, row in enumerate(range(j1, j2)):
+                        self.ollama_models_combo.insertItem(i1 + offset, texts[row], names[row])
+            else:
+                # Mostly new - one bulk insert and one repaint instead of an insert + relayout per row
+                self.ollama_models_combo.clear()
+                self.ollama_models_combo.addItems(texts)
+                for index, name in enumerate(names):
+                    if name is not None:
+                        self.ollama_models_combo.setItemData(index, name)
+            self._ollama_row_texts = texts
+            
+            if selected_model and selected_model in names:
+                self.ollama_models_combo.setCurrentIndex(names.index(selected_model))
+            self.ollama_models_combo.setUpdatesEnabled(True)
+        
+        self.log_status(f"✅ Loaded {len(models_list)} models in {category_count} categories", "success")
+    
     def save_settings(self):
         """Save all settings to both YAML and JSON files"""
         try:
+            # Tabs that were never opened still need their widgets for the values below
+            self.build_all_tabs()
+            self.commit_provider_fields()
+            
             # Update personality data
             self.personality["name"] = self.name_input.text()
             self.personality["system_prompt"] = self.prompt_text.toPlainText()
@@ -1514,48 +1840,53 @@ class MikoSetupGUI(QMainWindow):
             # Find device index for output device (for compatibility)
             output_name = self.output_device_combo.currentText()
             if output_name != "Default":
-                for device in self.output_devices:
-                    if device['name'] == output_name:
-                        self.audio_config["device_index"] = device['id']
-                        break
+                device = self._output_name_to_device.get(output_name)
+                if device is not None:
+                    self.audio_config["device_index"] = device['id']
             else:
                 self.audio_config["device_index"] = None
             
-            # Save to YAML file
-            if hasattr(self, 'yaml_config'):
-                import yaml
-                # Update YAML config with new values
-                if 'personality' not in self.yaml_config:
-                    self.yaml_config['personality'] = {}
-                if 'audio_devices' not in self.yaml_config:
-                    self.yaml_config['audio_devices'] = {}
-                if 'tts_config' not in self.yaml_config:
-                    self.yaml_config['tts_config'] = {}
+            # Update YAML config with new values
+            if 'personality' not in self.yaml_config:
+                self.yaml_config['personality'] = {}
+            if 'audio_devices' not in self.yaml_config:
+                self.yaml_config['audio_devices'] = {}
+            if 'tts_config' not in self.yaml_config:
+                self.yaml_config['tts_config'] = {}
                 
-                self.yaml_config['personality'].update(self.personality)
-                self.yaml_config['audio_devices'].update(self.audio_config)
+            self.yaml_config['personality'].update(self.personality)
+            self.yaml_config['audio_devices'].update(self.audio_config)
                 
-                # Also update tts_config section for TTS module compatibility
-                self.yaml_config['tts_config'].update({
-                    'ref_audio_path': self.personality["voice_settings"]["ref_audio_path"],
-                    'prompt_text': self.personality["voice_settings"]["prompt_text"],
-                    'text_lang': self.personality["voice_settings"]["language"],
-                    'prompt_lang': self.personality["voice_settings"]["language"]
-                })
+            # Also update tts_config section for TTS module compatibility
+            self.yaml_config['tts_config'].update({
+                'ref_audio_path': self.personality["voice_settings"]["ref_audio_path"],
+                'prompt_text': self.personality["voice_settings"]["prompt_text"],
+                'text_lang': self.personality["voice_settings"]["language"],
+                'prompt_lang': self.personality["voice_settings"]["language"]
+            })
                 
-                # Save YAML
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    yaml.dump(self.yaml_config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                print(f"✅ Saved settings to YAML: {self.config_file}")
+            # Save YAML (this write covers any pending debounced save; let one already running finish first)
+            self.yaml_save_timer.stop()
+            self.yaml_write_pool.waitForDone()
+            yaml_write = self.settings_write_pool.submit(save_yaml_atomic, self.config_file, self.yaml_config)
             
             # Save personality to JSON (for backward compatibility)
-            os.makedirs("modules", exist_ok=True)
-            with open(self.personality_file, 'w') as f:
-                json.dump(self.personality, f, indent=2)
+            if not MikoSetupGUI._modules_dir_ensured:
+                os.makedirs("modules", exist_ok=True)
+                MikoSetupGUI._modules_dir_ensured = True
+            json_writes = [self.settings_write_pool.submit(save_json_atomic, self.personality_file, self.personality)]
             
             # Save audio config to JSON (for backward compatibility)
-            with open(self.audio_config_file, 'w') as f:
-                json.dump(self.audio_config, f, indent=2)
+            json_writes.append(self.settings_write_pool.submit(save_json_atomic, self.audio_config_file, self.audio_config))
+            
+            # All three finish before we report; result() re-raises a failed write into the except below
+            wait([yaml_write] + json_writes)
+            if yaml_write.result():
+                print(f"✅ Saved settings to YAML: {self.config_file}")
+            else:
+                print(f"✅ YAML settings unchanged: {self.config_file}")
+            for json_write in json_writes:
+                json_write.result()
             
             QMessageBox.information(self, "Success", "Settings saved successfully!")
             self.log_status("✅ Settings saved!", "success")
@@ -1575,7 +1906,6 @@ class MikoSetupGUI(QMainWindow):
             vrm_process = subprocess.Popen(["./vrmloader/vrmloader.exe"])
             
             # Wait a moment for VRM loader to start up
-            import time
             time.sleep(2)
             
             # Start Miko